@@ -1,3 +1,8 @@
-nome = input("Digite seu nome: ")
-idade = int(input("Digite sua idade: "))
-print(f"Olá {nome}! Você tem {idade} anos.")
\ No newline at end of file
+def main():
+    nome = input("Digite seu nome: ")
+    idade = int(input("Digite sua idade: "))
+    print(f"Olá {nome}! Você tem {idade} anos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 from dotenv import load_dotenv
 from pathlib import Path
 import os
+import sys
 import requests
+import threading
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Carregar variáveis do .env
 dotenv_path = Path(__file__).parent / '.env'
@@ -65,6 +70,47 @@ def listar_estado_dados_qualidade_ar(pais):
         print(f"Erro ao buscar dados de qualidade do ar: {e}")
         return None
 
+def listar_cidades_dados_qualidade_ar(estado, pais):
+
+    try:
+        resposta = requests.get(f"http://api.airvisual.com/v2/cities?state={estado}&country={pais}&key={AIRVISUAL_KEY}")
+        resposta.raise_for_status()  # Levanta um erro se a requisição falhar
+        return resposta.json()  # Retorna os dados da resposta em formato JSON
+    except Exception as e:
+        print(f"Erro ao buscar dados de qualidade do ar: {e}")
+        return None
+
+_resolvedor = None
+_lock_resolvedor = threading.Lock()
+
+def obter_resolvedor(run_query=None):
+    """
+    Retorna o resolvedor cidade → (cidade, estado, país) da AirVisual, criado uma única vez.
+    O índice é montado a partir das listas de países, estados e cidades da própria
+    AirVisual e fica salvo em cache_airvisual.json.
+    Args:
+        run_query (callable): Opcional. Função que consulta a Sakila, usada para
+        descobrir o país de uma cidade quando ele não é informado.
+    Returns:
+        ResolvedorCidades: O resolvedor compartilhado.
+    """
+    global _resolvedor
+    # Chamado de vários threads (enriquecer_cidades, relatórios da aula 4):
+    # sem o lock, as primeiras chamadas criariam resolvedores diferentes
+    with _lock_resolvedor:
+        if _resolvedor is None:
+            from comum.resolvedor_cidades import ResolvedorCidades
+
+            _resolvedor = ResolvedorCidades(
+                listar_paises_dados_qualidade_ar,
+                listar_estado_dados_qualidade_ar,
+                listar_cidades_dados_qualidade_ar,
+                run_query=run_query,
+            )
+        elif run_query is not None and _resolvedor.run_query is None:
+            _resolvedor.run_query = run_query
+        return _resolvedor
+
 def buscar_qualidade_ar(cidade, estado, pais):
     try:
         resposta = requests.get(f'http://api.airvisual.com/v2/city?city={cidade}&state={estado}&country={pais}&key={AIRVISUAL_KEY}')
@@ -85,23 +131,123 @@ def lista_info_pelo_nome (pais):
         return None
 
 
-def enriquecimento_dados_cidade(cidade):
+def enriquecimento_dados_cidade(cidade, saida=None):
+    """
+    Junta clima, dados do país e qualidade do ar de uma cidade.
+    Args:
+        cidade (str): Nome da cidade.
+        saida: Opcional. Saída em lote (comum.saida) onde o registro é gravado;
+        sem ela, o resultado é impresso como antes.
+    Returns:
+        dict: Os dados enriquecidos, ou None em caso de erro.
+    """
     try:
         clima = buscar_clima(cidade)
         pais = clima["location"]["country"]
-        estado = clima["location"]["region"]
         dadosPais = lista_info_pelo_nome(pais)
-        dadosAr = buscar_qualidade_ar(cidade, estado, pais)
+        # A região da WeatherAPI raramente bate com o estado da AirVisual;
+        # o resolvedor devolve a tripla canônica e evita chamadas que falham.
+        local = obter_resolvedor().resolver(cidade, pais)
+        dadosAr = buscar_qualidade_ar(*local) if local else None
         dadosEnriquecidos = {
             "cidade": cidade,
             "clima": clima,
             "dadosPais": dadosPais,
             "dadosAr": dadosAr,
         }
-        print(json.dumps(dadosEnriquecidos, indent=4, ensure_ascii=False))
+        if saida is not None:
+            saida.escrever(dadosEnriquecidos)
+        else:
+            print(json.dumps(dadosEnriquecidos, indent=4, ensure_ascii=False))
+        return dadosEnriquecidos
     except Exception as e:
         print(f"Erro ao buscar dados de qualidade do ar: {e}")
         return None
-    
-#print(json.dumps(lista_info_pelo_nome("Spain"), indent=4, ensure_ascii=False))
-enriquecimento_dados_cidade("São Paulo")
+
+def _campo(dados, *caminho):
+    for passo in caminho:
+        try:
+            dados = dados[passo]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return dados
+
+def achatar_enriquecimento(dados):
+    """
+    Converte o registro aninhado de enriquecimento_dados_cidade nas colunas de
+    esquema_enriquecimento (campos ausentes viram None).
+    """
+    clima, pais, ar = dados.get("clima"), dados.get("dadosPais"), dados.get("dadosAr")
+    return {
+        "cidade": dados.get("cidade"),
+        "regiao": _campo(clima, "location", "region"),
+        "pais": _campo(clima, "location", "country"),
+        "lat": _campo(clima, "location", "lat"),
+        "lon": _campo(clima, "location", "lon"),
+        "temp_c": _campo(clima, "current", "temp_c"),
+        "umidade": _campo(clima, "current", "humidity"),
+        "vento_kph": _campo(clima, "current", "wind_kph"),
+        "condicao": _campo(clima, "current", "condition", "text"),
+        "pais_nome_oficial": _campo(pais, 0, "name", "official"),
+        "continente": _campo(pais, 0, "region"),
+        "sub_regiao": _campo(pais, 0, "subregion"),
+        "populacao": _campo(pais, 0, "population"),
+        "area_km2": _campo(pais, 0, "area"),
+        "estado_airvisual": _campo(ar, "data", "state"),
+        "aqi_us": _campo(ar, "data", "current", "pollution", "aqius"),
+        "poluente_principal": _campo(ar, "data", "current", "pollution", "mainus"),
+        "medicao_ar": _campo(ar, "data", "current", "pollution", "ts"),
+    }
+
+def esquema_enriquecimento():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("cidade", pa.string()),
+        ("regiao", pa.string()),
+        ("pais", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("temp_c", pa.float64()),
+        ("umidade", pa.float64()),
+        ("vento_kph", pa.float64()),
+        ("condicao", pa.string()),
+        ("pais_nome_oficial", pa.string()),
+        ("continente", pa.string()),
+        ("sub_regiao", pa.string()),
+        ("populacao", pa.int64()),
+        ("area_km2", pa.float64()),
+        ("estado_airvisual", pa.string()),
+        ("aqi_us", pa.float64()),
+        ("poluente_principal", pa.string()),
+        ("medicao_ar", pa.string()),
+    ])
+
+def enriquecer_cidades(cidades, caminho_saida="enriquecimento.jsonl.gz", max_workers=8):
+    """
+    Enriquece várias cidades em paralelo e grava tudo numa saída em lote.
+    Args:
+        cidades (list[str] | str): Cidades (ou texto separado por vírgulas).
+        caminho_saida (str): ".parquet" grava colunas achatadas; ".jsonl",
+        ".jsonl.gz" ou ".jsonl.zst" grava os registros aninhados.
+        max_workers (int): Requisições de cidades simultâneas.
+    Returns:
+        int: Quantidade de registros gravados.
+    """
+    from comum.saida import SaidaJSONL, SaidaParquet
+
+    if isinstance(cidades, str):
+        cidades = [c.strip() for c in cidades.split(",") if c.strip()]
+    if caminho_saida.endswith(".parquet"):
+        saida = SaidaParquet(caminho_saida, esquema=esquema_enriquecimento(), achatador=achatar_enriquecimento)
+    else:
+        saida = SaidaJSONL(caminho_saida)
+
+    with saida, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda c: enriquecimento_dados_cidade(c, saida), cidades))
+    print(f"{saida.registros_gravados} cidades enriquecidas gravadas em '{caminho_saida}'")
+    return saida.registros_gravados
+
+if __name__ == "__main__":
+    #print(json.dumps(lista_info_pelo_nome("Spain"), indent=4, ensure_ascii=False))
+    enriquecimento_dados_cidade("São Paulo")
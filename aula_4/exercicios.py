@@ -1,13 +1,16 @@
 import os
+import sys
 import time
+import threading
 import requests
-import pandas as pd
-import psycopg2
-import matplotlib.pyplot as plt
-import seaborn as sns
+from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+# pandas e os módulos de comum (que carregam pandas/numpy) são importados
+# dentro de cada função: exercícios leves como o 10 não pagam esse custo
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -19,25 +22,46 @@ db = os.getenv("PG_DB")
 weather_key = os.getenv("WEATHER_KEY")
 airvisual_key = os.getenv("AIRVISUAL_KEY")
 
-engine = psycopg2.connect(f"postgresql://{user}:{password}@{host}/{db}?sslmode=require")
+engine = None
+_lock_conexao = threading.Lock()
+
+
+def obter_conexao():
+    # A conexão só é aberta na primeira consulta, nunca no import do módulo.
+    # O lock evita abrir várias (e vazar todas menos uma) quando os nós SQL
+    # do agendador fazem a primeira consulta ao mesmo tempo.
+    global engine
+    with _lock_conexao:
+        if engine is None:
+            import psycopg2
+
+            engine = psycopg2.connect(f"postgresql://{user}:{password}@{host}/{db}?sslmode=require")
+        return engine
 
 
-def run_query(sql, coon=engine):
-    return pd.read_sql_query(sql, coon)
+def run_query(sql, coon=None):
+    # Colunas de texto repetitivas (city, country) podem virar category: os
+    # exercícios convertem o resultado das buscas (.astype) para não herdar o
+    # dtype categórico quando a busca mapeia valores um a um
+    import pandas as pd
+    from comum.compactacao import compactar_dataframe
+
+    return compactar_dataframe(pd.read_sql_query(sql, coon or obter_conexao()))
 
 # Exercício 1
+SQL_EXERCICIO1 = '''
+SELECT ci.city, COUNT(p.payment_id) as num_transacoes, COUNT(DISTINCT c.customer_id) as num_clientes
+FROM payment p
+JOIN customer c ON p.customer_id = c.customer_id
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+GROUP BY ci.city
+HAVING COUNT(p.payment_id) > 10
+'''
+
 def exercicio1_temperatura_media(run_query, get_temperatura):
-    query = '''
-    SELECT ci.city, COUNT(p.payment_id) as num_transacoes, COUNT(DISTINCT c.customer_id) as num_clientes
-    FROM payment p
-    JOIN customer c ON p.customer_id = c.customer_id
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    GROUP BY ci.city
-    HAVING COUNT(p.payment_id) > 10
-    '''
-    df_cidades = run_query(query)
-    df_cidades["temperatura"] = df_cidades["city"].apply(get_temperatura)
+    df_cidades = run_query(SQL_EXERCICIO1)
+    df_cidades["temperatura"] = df_cidades["city"].apply(get_temperatura).astype("float64")
     df_cidades.dropna(subset=["temperatura"], inplace=True)
     total_clientes = df_cidades["num_clientes"].sum()
     media_ponderada = (df_cidades["temperatura"] * df_cidades["num_clientes"]).sum() / total_clientes
@@ -52,18 +76,19 @@ def get_temperatura(cidade):
     except:
         return None
 
+SQL_EXERCICIO2 = '''
+SELECT ci.city, SUM(p.amount) as receita_total
+FROM payment p
+JOIN customer c ON p.customer_id = c.customer_id
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+GROUP BY ci.city
+ORDER BY receita_total DESC
+'''
+
 def exercicio2_receita_amena(run_query, get_temperatura):
-    query = '''
-    SELECT ci.city, SUM(p.amount) as receita_total
-    FROM payment p
-    JOIN customer c ON p.customer_id = c.customer_id
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    GROUP BY ci.city
-    ORDER BY receita_total DESC
-    '''
-    df = run_query(query)
-    df["temperatura"] = df["city"].apply(get_temperatura)
+    df = run_query(SQL_EXERCICIO2)
+    df["temperatura"] = df["city"].apply(get_temperatura).astype("float64")
     df.dropna(subset=["temperatura"], inplace=True)
     df_ameno = df[(df["temperatura"] >= 18) & (df["temperatura"] <= 24)]
     total = df_ameno["receita_total"].sum()
@@ -78,43 +103,68 @@ def get_populacao(pais):
     except:
         return None
 
+def get_info_pais(pais):
+    # Uma requisição à restcountries traz população e continente juntos
+    try:
+        r = requests.get(f"https://restcountries.com/v3.1/name/{pais}", timeout=5)
+        dados = r.json()[0]
+        return {"populacao": dados["population"], "continente": dados["region"]}
+    except:
+        return None
+
+SQL_EXERCICIO3 = '''
+SELECT co.country, COUNT(r.rental_id) as num_alugueis
+FROM rental r
+JOIN customer c ON r.customer_id = c.customer_id
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+JOIN country co ON ci.country_id = co.country_id
+GROUP BY co.country
+ORDER BY num_alugueis DESC
+'''
+
 def exercicio3_alugueis_por_populacao(run_query, get_populacao):
-    query = '''
-    SELECT co.country, COUNT(r.rental_id) as num_alugueis
-    FROM rental r
-    JOIN customer c ON r.customer_id = c.customer_id
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    JOIN country co ON ci.country_id = co.country_id
-    GROUP BY co.country
-    ORDER BY num_alugueis DESC
-    '''
-    df = run_query(query)
-    df["populacao"] = df["country"].apply(get_populacao)
+    df = run_query(SQL_EXERCICIO3)
+    df["populacao"] = df["country"].apply(get_populacao).astype("float64")
     df.dropna(subset=["populacao"], inplace=True)
     df["alugueis_por_1000"] = (df["num_alugueis"] / df["populacao"]) * 1000
     print(df.sort_values(by="alugueis_por_1000", ascending=False))
 
 # Exercício 4
-def get_aqi(cidade):
+def obter_resolvedor():
+    # Reaproveita as listagens da AirVisual da aula 2; o país vem da Sakila
+    from aula_2.main import obter_resolvedor as resolvedor_aula2
+
+    return resolvedor_aula2(run_query)
+
+def get_aqi(cidade, pais=None):
+    local = obter_resolvedor().resolver(cidade, pais)
+    if local is None:
+        return None
+    cidade_av, estado, pais_av = local
     try:
-        r = requests.get(f"http://api.airvisual.com/v2/city?city={cidade}&key={airvisual_key}", timeout=5)
+        r = requests.get(
+            "http://api.airvisual.com/v2/city",
+            params={"city": cidade_av, "state": estado, "country": pais_av, "key": airvisual_key},
+            timeout=5,
+        )
         return r.json()["data"]["current"]["pollution"]["aqius"]
     except:
         return None
 
+SQL_EXERCICIO4_CIDADES = '''
+SELECT ci.city, COUNT(c.customer_id) as num_clientes
+FROM customer c
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+GROUP BY ci.city
+ORDER BY num_clientes DESC
+LIMIT 10
+'''
+
 def exercicio4_filmes_poluidos(run_query, get_aqi):
-    query_cidades = '''
-    SELECT ci.city, COUNT(c.customer_id) as num_clientes
-    FROM customer c
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    GROUP BY ci.city
-    ORDER BY num_clientes DESC
-    LIMIT 10
-    '''
-    df_cidades = run_query(query_cidades)
-    df_cidades["AQI"] = df_cidades["city"].apply(get_aqi)
+    df_cidades = run_query(SQL_EXERCICIO4_CIDADES)
+    df_cidades["AQI"] = df_cidades["city"].apply(get_aqi).astype("float64")
     poluidas = df_cidades[df_cidades["AQI"] > 150]["city"].tolist()
     if poluidas:
         cidades_str = ",".join([f"'{c}'" for c in poluidas])
@@ -134,93 +184,124 @@ def exercicio4_filmes_poluidos(run_query, get_aqi):
         print(df_filmes)
 
 # Exercício 5
+SQL_EXERCICIO5 = '''
+SELECT c.first_name, c.last_name, ci.city, co.country
+FROM customer c
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+JOIN country co ON ci.country_id = co.country_id
+'''
+
 def exercicio5_clientes_areas_criticas(run_query, get_aqi, get_temperatura):
-    query = '''
-    SELECT c.first_name, c.last_name, ci.city, co.country
-    FROM customer c
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    JOIN country co ON ci.country_id = co.country_id
-    '''
-    df = run_query(query)
-    df["AQI"] = df["city"].apply(get_aqi)
-    df["temperatura"] = df["city"].apply(get_temperatura)
+    df = run_query(SQL_EXERCICIO5)
+    df["AQI"] = df["city"].apply(get_aqi).astype("float64")
+    df["temperatura"] = df["city"].apply(get_temperatura).astype("float64")
     df = df[(df["AQI"] > 130) & (df["temperatura"].notnull())]
     df["zona_atencao"] = "Sim"
     print(df)
 
 # Exercício 6
-def exercicio6_receita_por_continente(run_query, get_populacao):
-    query = '''
-    SELECT co.country, SUM(p.amount) as receita_total
-    FROM payment p
-    JOIN customer c ON p.customer_id = c.customer_id
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    JOIN country co ON ci.country_id = co.country_id
-    GROUP BY co.country
-    '''
-    df = run_query(query)
-    df["continente"] = df["country"].apply(lambda x: requests.get(f"https://restcountries.com/v3.1/name/{x}").json()[0]["region"] if requests.get(f"https://restcountries.com/v3.1/name/{x}").ok else None)
+def get_continente(pais):
+    info = get_info_pais(pais)
+    return info["continente"] if info else None
+
+SQL_EXERCICIO6 = '''
+SELECT co.country, SUM(p.amount) as receita_total
+FROM payment p
+JOIN customer c ON p.customer_id = c.customer_id
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+JOIN country co ON ci.country_id = co.country_id
+GROUP BY co.country
+'''
+
+def exercicio6_receita_por_continente(run_query, get_continente, renderizar=True):
+    df = run_query(SQL_EXERCICIO6)
+    df["continente"] = df["country"].apply(get_continente).astype(object)
     df.dropna(subset=["continente"], inplace=True)
     receita_por_continente = df.groupby("continente")["receita_total"].sum()
-    receita_por_continente.plot.pie(autopct='%1.1f%%')
-    plt.title("Receita por Continente")
-    plt.show()
+    spec = {
+        "nome": "receita_por_continente",
+        "tipo": "pizza",
+        "dados": receita_por_continente,
+        "titulo": "Receita por Continente",
+    }
+    if not renderizar:
+        return spec
+    from comum.renderizacao import renderizar_graficos
+
+    return renderizar_graficos([spec])[0]
 
 # Exercício 7
-def exercicio7_tempo_medio(run_query, get_temperatura):
-    query = '''
-    SELECT ci.city, AVG(EXTRACT(epoch FROM (r.return_date - r.rental_date))/3600) as tempo_medio_horas
-    FROM rental r
-    JOIN inventory i ON r.inventory_id = i.inventory_id
-    JOIN store s ON i.store_id = s.store_id
-    JOIN address a ON s.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    GROUP BY ci.city
-    '''
-    df = run_query(query)
-    df["temperatura"] = df["city"].apply(get_temperatura)
+SQL_EXERCICIO7 = '''
+SELECT ci.city, AVG(EXTRACT(epoch FROM (r.return_date - r.rental_date))/3600) as tempo_medio_horas
+FROM rental r
+JOIN inventory i ON r.inventory_id = i.inventory_id
+JOIN store s ON i.store_id = s.store_id
+JOIN address a ON s.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+GROUP BY ci.city
+'''
+
+def exercicio7_tempo_medio(run_query, get_temperatura, renderizar=True):
+    df = run_query(SQL_EXERCICIO7)
+    df["temperatura"] = df["city"].apply(get_temperatura).astype("float64")
     df.dropna(subset=["temperatura"], inplace=True)
-    sns.scatterplot(x="temperatura", y="tempo_medio_horas", data=df)
-    sns.regplot(x="temperatura", y="tempo_medio_horas", data=df, scatter=False, color="red")
-    plt.title("Tempo Médio de Aluguel vs Temperatura")
-    plt.xlabel("Temperatura (°C)")
-    plt.ylabel("Tempo Médio de Aluguel (horas)")
-    plt.show()
+    spec = {
+        "nome": "tempo_medio_vs_temperatura",
+        "tipo": "dispersao",
+        "dados": df,
+        "x": "temperatura",
+        "y": "tempo_medio_horas",
+        "regressao": True,
+        "titulo": "Tempo Médio de Aluguel vs Temperatura",
+        "xlabel": "Temperatura (°C)",
+        "ylabel": "Tempo Médio de Aluguel (horas)",
+    }
+    if not renderizar:
+        return spec
+    from comum.renderizacao import renderizar_graficos
+
+    return renderizar_graficos([spec])[0]
 
 # Exercício 8
+SQL_EXERCICIO8 = '''
+SELECT c.customer_id, c.first_name, c.last_name, ci.city, COUNT(r.rental_id) as total_alugueis, SUM(p.amount) as gasto_total
+FROM customer c
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+JOIN rental r ON c.customer_id = r.customer_id
+JOIN payment p ON r.rental_id = p.rental_id
+GROUP BY c.customer_id, ci.city
+'''
+
 def exercicio8_perfil_clima(run_query, get_aqi, get_temperatura):
-    query = '''
-    SELECT c.customer_id, c.first_name, c.last_name, ci.city, COUNT(r.rental_id) as total_alugueis, SUM(p.amount) as gasto_total
-    FROM customer c
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    JOIN rental r ON c.customer_id = r.customer_id
-    JOIN payment p ON r.rental_id = p.rental_id
-    GROUP BY c.customer_id, ci.city
-    '''
-    df = run_query(query)
-    df["AQI"] = df["city"].apply(get_aqi)
-    df["temperatura"] = df["city"].apply(get_temperatura)
+    import pandas as pd
+
+    df = run_query(SQL_EXERCICIO8)
+    df["AQI"] = df["city"].apply(get_aqi).astype("float64")
+    df["temperatura"] = df["city"].apply(get_temperatura).astype("float64")
     df.dropna(subset=["AQI", "temperatura"], inplace=True)
     df["faixa_etaria"] = pd.cut(df.index, bins=3, labels=["Jovem", "Adulto", "Sênior"])
     print(df.groupby("faixa_etaria").mean())
 
 # Exercício 9
+SQL_EXERCICIO9 = '''
+SELECT c.customer_id, c.first_name, c.last_name, ci.city, co.country, SUM(p.amount) as receita
+FROM customer c
+JOIN address a ON c.address_id = a.address_id
+JOIN city ci ON a.city_id = ci.city_id
+JOIN country co ON ci.country_id = co.country_id
+JOIN payment p ON c.customer_id = p.customer_id
+GROUP BY c.customer_id, ci.city, co.country
+'''
+
 def exercicio9_exportar_excel(run_query, get_aqi, get_temperatura):
-    query = '''
-    SELECT c.customer_id, c.first_name, c.last_name, ci.city, co.country, SUM(p.amount) as receita
-    FROM customer c
-    JOIN address a ON c.address_id = a.address_id
-    JOIN city ci ON a.city_id = ci.city_id
-    JOIN country co ON ci.country_id = co.country_id
-    JOIN payment p ON c.customer_id = p.customer_id
-    GROUP BY c.customer_id, ci.city, co.country
-    '''
-    df = run_query(query)
-    df["AQI"] = df["city"].apply(get_aqi)
-    df["temperatura"] = df["city"].apply(get_temperatura)
+    import pandas as pd
+
+    df = run_query(SQL_EXERCICIO9)
+    df["AQI"] = df["city"].apply(get_aqi).astype("float64")
+    df["temperatura"] = df["city"].apply(get_temperatura).astype("float64")
     media_receita = df["receita"].mean()
     filtro = (df["temperatura"] < 15) & (df["AQI"] > 100) & (df["receita"] > media_receita)
     df_filtrado = df[filtro]
@@ -238,13 +319,176 @@ def exercicio10_cache_clima(get_temperatura, cidade, cache={}):
         cache[cidade] = temp
         return temp
 
+# Relatórios com dependências compartilhadas
+# Cada enriquecimento (serviço externo): função de busca e coluna consultada
+ENRIQUECIMENTOS = {
+    "temperatura": {"buscar": "get_temperatura", "coluna": "city"},
+    "aqi": {"buscar": "get_aqi", "coluna": "city"},
+    "pais": {"buscar": "get_info_pais", "coluna": "country"},
+}
+
+# Argumento que o exercício recebe → (enriquecimento, campo do resultado; None = o próprio valor)
+ARGUMENTOS = {
+    "get_temperatura": ("temperatura", None),
+    "get_aqi": ("aqi", None),
+    "get_populacao": ("pais", "populacao"),
+    "get_continente": ("pais", "continente"),
+}
+
+# Cada relatório declara as consultas que lê e as buscas que recebe como argumento
+RELATORIOS = {
+    "exercicio1": {"funcao": exercicio1_temperatura_media, "sql": [SQL_EXERCICIO1], "argumentos": ["get_temperatura"]},
+    "exercicio2": {"funcao": exercicio2_receita_amena, "sql": [SQL_EXERCICIO2], "argumentos": ["get_temperatura"]},
+    "exercicio3": {"funcao": exercicio3_alugueis_por_populacao, "sql": [SQL_EXERCICIO3], "argumentos": ["get_populacao"]},
+    "exercicio4": {"funcao": exercicio4_filmes_poluidos, "sql": [SQL_EXERCICIO4_CIDADES], "argumentos": ["get_aqi"]},
+    "exercicio5": {"funcao": exercicio5_clientes_areas_criticas, "sql": [SQL_EXERCICIO5], "argumentos": ["get_aqi", "get_temperatura"]},
+    "exercicio6": {"funcao": exercicio6_receita_por_continente, "sql": [SQL_EXERCICIO6], "argumentos": ["get_continente"], "params": {"renderizar": False}},
+    "exercicio7": {"funcao": exercicio7_tempo_medio, "sql": [SQL_EXERCICIO7], "argumentos": ["get_temperatura"], "params": {"renderizar": False}},
+    "exercicio8": {"funcao": exercicio8_perfil_clima, "sql": [SQL_EXERCICIO8], "argumentos": ["get_aqi", "get_temperatura"]},
+    "exercicio9": {"funcao": exercicio9_exportar_excel, "sql": [SQL_EXERCICIO9], "argumentos": ["get_aqi", "get_temperatura"]},
+}
+
+def _enriquecimentos(nome):
+    # Enriquecimentos de que um relatório depende, na ordem dos argumentos, sem repetição
+    return list(dict.fromkeys(ARGUMENTOS[a][0] for a in RELATORIOS[nome]["argumentos"]))
+
+def _normalizar_sql(sql):
+    # Consultas que só diferem em espaços/indentação viram o mesmo nó
+    return " ".join(sql.split())
+
+def _no_sql(sql):
+    def consultar():
+        return run_query(sql)
+    return consultar
+
+def _no_enriquecimento(nome, max_consultas):
+    info = ENRIQUECIMENTOS[nome]
+
+    def enriquecer(*frames):
+        # Valores distintos de todas as consultas que usam este serviço, buscados uma vez
+        valores = set()
+        for df in frames:
+            valores.update(df[info["coluna"]].dropna().unique())
+        valores = sorted(valores)
+        buscar = globals()[info["buscar"]]
+        with ThreadPoolExecutor(max_workers=max_consultas) as executor:
+            return dict(zip(valores, executor.map(buscar, valores)))
+
+    return enriquecer
+
+def _leitor(valores, campo):
+    if campo is None:
+        return valores.get
+    return lambda chave: (valores.get(chave) or {}).get(campo)
+
+def _no_relatorio(nome, consulta_extra):
+    info = RELATORIOS[nome]
+
+    def relatorio(*entradas):
+        frames = {_normalizar_sql(sql): df for sql, df in zip(info["sql"], entradas)}
+        valores = dict(zip(_enriquecimentos(nome), entradas[len(info["sql"]):]))
+
+        def consulta(sql):
+            # Cada relatório recebe uma cópia: os exercícios alteram o DataFrame
+            df = frames.get(_normalizar_sql(sql))
+            return (df if df is not None else consulta_extra(sql)).copy()
+
+        kwargs = {
+            argumento: _leitor(valores[ARGUMENTOS[argumento][0]], ARGUMENTOS[argumento][1])
+            for argumento in info["argumentos"]
+        }
+        return info["funcao"](consulta, **kwargs, **info.get("params", {}))
+
+    return relatorio
+
+def executar_relatorios(nomes=None, max_workers=8, max_consultas=16):
+    """
+    Executa os relatórios (exercícios 1 a 9) como um grafo de dependências.
+    - Consultas SQL iguais viram um só nó e rodam uma vez.
+    - Cada serviço (temperatura, AQI, dados do país) é um nó que busca, uma vez
+      e em paralelo, os valores distintos de todas as consultas que o usam; a
+      busca do país alimenta tanto a população quanto o continente.
+    - Os gráficos (exercícios 6 e 7) são renderizados juntos, num só lote,
+      depois que o grafo termina.
+    - Nós independentes rodam ao mesmo tempo; cada relatório roda assim que
+      suas consultas e enriquecimentos ficam prontos.
+    Consultas montadas em tempo de execução (a segunda do exercício 4) são
+    feitas na hora e memorizadas.
+    Args:
+        nomes (list[str]): Relatórios a executar (padrão: todos de RELATORIOS).
+        max_workers (int): Nós do grafo executados simultaneamente.
+        max_consultas (int): Requisições simultâneas por serviço externo.
+    Returns:
+        dict: nome do relatório → retorno do exercício (caminho do arquivo
+        para os gráficos).
+    """
+    nomes = nomes or list(RELATORIOS)
+    from comum.agendador import Agendador
+
+    agendador = Agendador(max_workers)
+    memoria, lock = {}, threading.Lock()
+
+    def consulta_extra(sql):
+        chave = _normalizar_sql(sql)
+        with lock:
+            if chave not in memoria:
+                memoria[chave] = run_query(sql)
+            return memoria[chave]
+
+    consultas_por_servico = {}
+    for nome in nomes:
+        info = RELATORIOS[nome]
+        nos_sql = [agendador.adicionar(("sql", _normalizar_sql(sql)), _no_sql(sql)) for sql in info["sql"]]
+        for servico in _enriquecimentos(nome):
+            nos_servico = consultas_por_servico.setdefault(servico, [])
+            nos_servico.extend(n for n in nos_sql if n not in nos_servico)
+
+    for servico, nos_sql in consultas_por_servico.items():
+        agendador.adicionar(("enriquecimento", servico), _no_enriquecimento(servico, max_consultas), nos_sql)
+
+    for nome in nomes:
+        info = RELATORIOS[nome]
+        dependencias = [("sql", _normalizar_sql(sql)) for sql in info["sql"]]
+        dependencias += [("enriquecimento", servico) for servico in _enriquecimentos(nome)]
+        agendador.adicionar(("relatorio", nome), _no_relatorio(nome, consulta_extra), dependencias)
+
+    inicio = time.time()
+    resultados, erros, tempos = agendador.executar()
+    duracao = time.time() - inicio
+
+    num_sql = sum(1 for chave in tempos if chave[0] == "sql") + len(memoria)
+    print(f"\n[Agendador] {len(nomes)} relatórios em {duracao:.2f}s: {num_sql} consultas SQL distintas")
+    for servico in consultas_por_servico:
+        valores = resultados.get(("enriquecimento", servico))
+        if valores is not None:
+            print(f"[Agendador] {servico}: {len(valores)} consultas distintas ({tempos[('enriquecimento', servico)]:.2f}s)")
+    for chave, erro in erros.items():
+        print(f"[Agendador] Falha em {chave[0]} {chave[1][:60]}: {erro!r}")
+    retornos = {nome: resultados.get(("relatorio", nome)) for nome in nomes}
+    # Relatórios com renderizar=False devolvem a spec do gráfico: tudo num lote só
+    graficos = [
+        nome for nome in nomes
+        if RELATORIOS[nome].get("params", {}).get("renderizar") is False and retornos[nome] is not None
+    ]
+    if graficos:
+        from comum.renderizacao import renderizar_graficos
+
+        for nome, caminho in zip(graficos, renderizar_graficos([retornos[nome] for nome in graficos])):
+            retornos[nome] = caminho
+    return retornos
+
 # Exemplo de uso
 #exercicio1_temperatura_media(run_query, get_temperatura)
 # exercicio2_receita_amena(run_query, get_temperatura)
 # exercicio3_alugueis_por_populacao(run_query, get_populacao)
 # exercicio4_filmes_poluidos(run_query, get_aqi)
 # exercicio5_clientes_areas_criticas(run_query, get_aqi, get_temperatura)
-# exercicio6_receita_por_continente(run_query, get_populacao)
+# exercicio6_receita_por_continente(run_query, get_continente)
 # exercicio7_tempo_medio(run_query, get_temperatura)
 # exercicio8_perfil_clima(run_query, get_aqi, get_temperatura)
-# exercicio9_exportar_excel(run_query, get_aqi, get_temperatura)
\ No newline at end of file
+# exercicio9_exportar_excel(run_query, get_aqi, get_temperatura)
+# renderizar_graficos([
+#     exercicio6_receita_por_continente(run_query, get_continente, renderizar=False),
+#     exercicio7_tempo_medio(run_query, get_temperatura, renderizar=False),
+# ])
+# executar_relatorios()
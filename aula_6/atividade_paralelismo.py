@@ -1,15 +1,19 @@
 import os
+import sys
 import time
 import random
 import csv
 import threading
-import requests
 import math
-import pandas as pd
-import numpy as np
 
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-import multiprocessing as mp
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comum.pool_aquecido import obter_pool
+
+# pandas, numpy e requests são importados dentro de cada exercício que os usa,
+# para que exercícios leves (e o executar.py) não paguem o custo de import.
 
 # ------------------------------------------------------------
 # NÍVEL 1 — Fundamentos com foco em I/O
@@ -22,6 +26,7 @@ def nivel1_exercicio1():
     - Simula a coleta de dados de 10 endpoints (httpbin.org).
     - Cada thread faz uma requisição GET e armazena status, latência e parte do conteúdo.
     """
+    import requests
 
     def crawl_endpoint(endpoint_url, resultados, index):
         start = time.time()
@@ -81,12 +86,77 @@ def nivel1_exercicio1():
             print(f"[{idx}] {info['url']} → ERRO: {info['erro']}")
 
 
-def nivel1_exercicio2():
+def servidor_http_teste(porta):
+    """
+    Servidor HTTP local (aiohttp) para testes de carga: responde 200 com um JSON
+    pequeno em qualquer caminho. Roda até o processo ser encerrado.
+    """
+    from aiohttp import web
+
+    async def responder(request):
+        return web.json_response({"path": request.path_qs})
+
+    app = web.Application()
+    app.router.add_get("/{caminho:.*}", responder)
+    web.run_app(app, host="127.0.0.1", port=porta, print=None, access_log=None)
+
+
+def nivel1_exercicio1_escalavel(num_urls=20_000, max_workers=200):
+    """
+    1b. Crawler escalável (evolução do Exercício 1)
+    - Sobe um servidor HTTP local em outro processo.
+    - Gera num_urls URLs (10% repetidas) sob demanda e coleta todas com o
+      crawler assíncrono (fronteira limitada, deduplicação, limite por host).
+    - Os resultados vão sendo gravados em 'crawler_resultados.jsonl'.
+    """
+    import socket
+    import multiprocessing as mp
+    from comum.crawler import crawl
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+
+    servidor = mp.get_context("fork").Process(target=servidor_http_teste, args=(porta,), daemon=True)
+    servidor.start()
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", porta), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+
+        distintas = max(1, int(num_urls * 0.9))
+        sementes = (
+            f"http://127.0.0.1:{porta}/get?valor={i % distintas}" for i in range(num_urls)
+        )
+        estatisticas = crawl(
+            sementes,
+            "crawler_resultados.jsonl",
+            max_workers=max_workers,
+            max_por_host=max_workers,
+        )
+    finally:
+        servidor.terminate()
+        servidor.join()
+
+    print("\n=== CRAWLER ESCALÁVEL (Exercício 1b) ===")
+    print(
+        f"{estatisticas['ok']} ok, {estatisticas['erros']} erros, "
+        f"{estatisticas['duplicadas']} duplicadas ignoradas em {estatisticas['segundos']:.2f}s "
+        f"→ {estatisticas['urls_por_segundo']:.0f} URLs/s"
+    )
+    return estatisticas
+
+
+def nivel1_exercicio2(num_arquivos=10, max_workers=5):
     """
     2. Ingestão de múltiplos arquivos CSV com ThreadPoolExecutor
     - Gera 10 CSVs de exemplo (caso não existam).
     - Lê todos em paralelo usando ThreadPoolExecutor e exibe o cabeçalho de cada DataFrame.
     """
+    import pandas as pd
 
     def gerar_csv_exemplo(caminho, num_linhas=5):
         if os.path.exists(caminho):
@@ -108,14 +178,14 @@ def nivel1_exercicio2():
     os.makedirs(pasta_csv, exist_ok=True)
 
     caminhos = []
-    for i in range(1, 11):
+    for i in range(1, num_arquivos + 1):
         nome_arquivo = f"arquivo_{i}.csv"
         caminho = os.path.join(pasta_csv, nome_arquivo)
         gerar_csv_exemplo(caminho, num_linhas=10 + i)
         caminhos.append(caminho)
 
     dataframes = []
-    with ThreadPoolExecutor(max_workers=5) as executor:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = [executor.submit(ler_csv, caminho) for caminho in caminhos]
         for future in futures:
             dataframes.append(future.result())
@@ -132,6 +202,7 @@ def nivel1_exercicio3():
     - Testa o tempo de resposta de 10 URLs em paralelo (httpbin.org).
     - Grava os resultados (url, status_code, latência, erro) em um CSV.
     """
+    import requests
 
     def testar_url(url, resultados, index):
         start = time.time()
@@ -198,7 +269,7 @@ def nivel1_exercicio3():
     print(f"\nResultados gravados em '{nome_csv}'. (Exercício 3)")
 
 
-def nivel1_exercicio4():
+def nivel1_exercicio4(num_arquivos=10, max_workers=4):
     """
     4. Download concorrente de arquivos (simulado)
     - Simula o download de 10 arquivos “grandes” usando sleep aleatório.
@@ -217,11 +288,11 @@ def nivel1_exercicio4():
         print(f"Download concluído: {nome_arquivo}")
         return nome_arquivo, tempo_simulado
 
-    nomes = [f"arquivo_grande_{i}.bin" for i in range(1, 11)]
+    nomes = [f"arquivo_grande_{i}.bin" for i in range(1, num_arquivos + 1)]
     os.makedirs("downloads_simulados", exist_ok=True)
     caminhos = [os.path.join("downloads_simulados", nm) for nm in nomes]
 
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = [executor.submit(simular_download, caminho) for caminho in caminhos]
         for future in futures:
             arquivo, duracao = future.result()
@@ -288,17 +359,15 @@ def transformacao_pesada(sublista):
     return resultado
 
 
-def nivel2_exercicio6():
+def nivel2_exercicio6(tamanho_total=1_000_000, num_processos=4):
     """
-    6. Transformação de dados pesados com ProcessPoolExecutor
+    6. Transformação de dados pesados com o pool de processos compartilhado
     - Gera 1_000_000 valores aleatórios.
     - Divide em 4 blocos e aplica em cada um uma operação custosa (sqrt + log + x^2).
     """
 
-    tamanho_total = 1_000_000
     dados = [random.uniform(0, 1000) for _ in range(tamanho_total)]
 
-    num_processos = 4
     tamanho_bloco = tamanho_total // num_processos
     blocos = [
         dados[i * tamanho_bloco : (i + 1) * tamanho_bloco] for i in range(num_processos)
@@ -307,12 +376,12 @@ def nivel2_exercicio6():
     if resto:
         blocos[-1].extend(resto)
 
-    with ProcessPoolExecutor(max_workers=num_processos) as executor:
-        futures = [executor.submit(transformacao_pesada, bloco) for bloco in blocos]
+    executor = obter_pool(num_processos)
+    futures = [executor.submit(transformacao_pesada, bloco) for bloco in blocos]
 
-        resultados = []
-        for future in futures:
-            resultados.extend(future.result())
+    resultados = []
+    for future in futures:
+        resultados.extend(future.result())
 
     print(
         f"Transformação concluída. Total de elementos processados: {len(resultados)} (Exercício 6)"
@@ -320,22 +389,23 @@ def nivel2_exercicio6():
 
 
 def funcao_complexa(df_slice):
-    df = df_slice.copy()
-    df["Resultado"] = np.sqrt(df["X"] ** 2 + df["Y"] ** 2) + np.log(
-        df["X"] + df["Y"] + 1
-    )
-    return df
+    # sqrt(X^2+Y^2)+log(X+Y+1) avaliado em tiles, sem temporários do tamanho da coluna
+    # (ver aula_6/benchmark_funcao_complexa.py para a comparação com a versão antiga)
+    from comum.kernels import aplicar_kernel, kernel_norma_log1p
+
+    return aplicar_kernel(df_slice, kernel_norma_log1p, ["X", "Y"], "Resultado")
 
 
-def nivel2_exercicio7():
+def nivel2_exercicio7(num_linhas=200_000, num_processos=4):
     """
     7. Paralelizar aplicação de funções complexas em DataFrames
     - Cria um DataFrame de 200.000 linhas com colunas X e Y.
     - Divide em 4 partes e, em cada processo, aplica cálculo: sqrt(X^2+Y^2)+log(X+Y+1).
     - Concatena resultados e mostra as últimas linhas.
     """
+    import pandas as pd
+    import numpy as np
 
-    num_linhas = 200_000
     df = pd.DataFrame(
         {
             "X": np.random.uniform(0, 100, size=num_linhas),
@@ -343,12 +413,11 @@ def nivel2_exercicio7():
         }
     )
 
-    num_processos = 4
     blocos = np.array_split(df, num_processos)
 
-    with ProcessPoolExecutor(max_workers=num_processos) as executor:
-        futures = [executor.submit(funcao_complexa, bloco) for bloco in blocos]
-        partes_processadas = [future.result() for future in futures]
+    executor = obter_pool(num_processos)
+    futures = [executor.submit(funcao_complexa, bloco) for bloco in blocos]
+    partes_processadas = [future.result() for future in futures]
 
     df_transformado = pd.concat(partes_processadas, ignore_index=True)
     print("DataFrame transformado. Exemplo de linhas finais (Exercício 7):")
@@ -356,9 +425,12 @@ def nivel2_exercicio7():
 
 
 def gerar_parquet_exemplo(caminho, num_linhas=1000):
+    import numpy as np
+    from comum.compactacao import dataframe_compacto
+
     if os.path.exists(caminho):
         return
-    df = pd.DataFrame(
+    df = dataframe_compacto(
         {
             "A": np.random.randint(0, 100, size=num_linhas),
             "B": np.random.random(size=num_linhas),
@@ -369,12 +441,14 @@ def gerar_parquet_exemplo(caminho, num_linhas=1000):
 
 
 def converter_parquet_para_csv(caminho_parquet, caminho_csv):
+    import pandas as pd
+
     df = pd.read_parquet(caminho_parquet)
     df.to_csv(caminho_csv, index=False)
     print(f"Convertido: {caminho_parquet} → {caminho_csv}")
 
 
-def nivel2_exercicio8():
+def nivel2_exercicio8(num_arquivos=10, max_workers=4):
     """
     8. Conversão paralela de arquivos Parquet → CSV
     - Gera 10 Parquets de exemplo (cada um com 5.000+ linhas).
@@ -387,7 +461,7 @@ def nivel2_exercicio8():
 
     caminhos_parquet = []
     caminhos_csv = []
-    for i in range(1, 11):
+    for i in range(1, num_arquivos + 1):
         nome_pq = os.path.join(pasta_parquet, f"arquivo_{i}.parquet")
         gerar_parquet_exemplo(nome_pq, num_linhas=5000 + i * 100)
         caminhos_parquet.append(nome_pq)
@@ -395,45 +469,87 @@ def nivel2_exercicio8():
         nome_csv = os.path.join(pasta_csv, f"arquivo_{i}.csv")
         caminhos_csv.append(nome_csv)
 
-    with ProcessPoolExecutor(max_workers=4) as executor:
-        futures = []
-        for pq, csv_out in zip(caminhos_parquet, caminhos_csv):
-            futures.append(executor.submit(converter_parquet_para_csv, pq, csv_out))
-        for future in futures:
-            future.result()
+    executor = obter_pool(max_workers)
+    futures = []
+    for pq, csv_out in zip(caminhos_parquet, caminhos_csv):
+        futures.append(executor.submit(converter_parquet_para_csv, pq, csv_out))
+    for future in futures:
+        future.result()
 
     print("\nTodas as conversões Parquet → CSV foram concluídas. (Exercício 8)")
 
 
 def agregacoes_por_bloco(df_slice):
-    agg = df_slice.groupby("Chave")["Valor"].agg(["sum", "mean", "std"]).reset_index()
+    agg = df_slice.groupby("Chave", observed=True)["Valor"].agg(["sum", "mean", "std"]).reset_index()
     return agg
 
 
-def nivel2_exercicio9():
+def gerar_blocos_chave_valor(num_linhas, tamanho_bloco):
+    import numpy as np
+    from comum.compactacao import dataframe_compacto
+
+    import pandas as pd
+
+    # Categorias fixas: todos os blocos saem com o mesmo dtype da Chave
+    grupos = [f"Grupo_{i}" for i in range(1, 11)]
+    for inicio in range(0, num_linhas, tamanho_bloco):
+        n = min(tamanho_bloco, num_linhas - inicio)
+        yield dataframe_compacto(
+            {
+                "Chave": pd.Categorical(np.random.choice(grupos, size=n), categories=grupos),
+                "Valor": np.random.random(size=n) * 100,
+            }
+        )
+
+
+def nivel2_exercicio9(num_linhas=500_000, num_processos=4, fora_memoria=False, tamanho_bloco=100_000, conferir=False):
     """
-    9. Cálculo de agregações pesadas com multiprocessing
+    9. Cálculo de agregações pesadas com o pool de processos compartilhado
     - Gera um DataFrame com 500.000 linhas, chaves em 10 grupos e valores aleatórios.
     - Divide em 4 blocos, cada processo calcula soma, média e std por grupo no bloco.
     - Em seguida, concatena resultados parciais e faz agregação final por grupo.
+    - Com fora_memoria=True, os dados são gerados em blocos de `tamanho_bloco`
+      linhas, particionados por hash da Chave em arquivos de spill e agregados
+      por partição nos workers (memória limitada, qualquer número de linhas).
+    - Com conferir=True (junto de fora_memoria), os blocos são mantidos em
+      memória e o resultado é comparado com um groupby().agg() comum.
     """
+    import pandas as pd
+    import numpy as np
+    from comum.compactacao import dataframe_compacto
+
+    if fora_memoria:
+        from comum.agregacao_fora_memoria import agregar_fora_memoria, conferir_agregacao
+
+        blocos = gerar_blocos_chave_valor(num_linhas, tamanho_bloco)
+        if conferir:
+            blocos = list(blocos)
+        agg_final = agregar_fora_memoria(
+            blocos,
+            "Chave",
+            "Valor",
+            pool=obter_pool(num_processos),
+        )
+        print("Agregações finais por grupo, fora da memória (Exercício 9):")
+        print(agg_final)
+        if conferir:
+            conferir_agregacao(agg_final, pd.concat(blocos, ignore_index=True), "Chave", "Valor")
+            print("Conferência com groupby em memória: OK")
+        return
 
-
-    num_linhas = 500_000
     chaves = np.random.choice([f"Grupo_{i}" for i in range(1, 11)], size=num_linhas)
     valores = np.random.random(size=num_linhas) * 100
 
-    df = pd.DataFrame({"Chave": chaves, "Valor": valores})
+    df = dataframe_compacto({"Chave": chaves, "Valor": valores}, relatorio=True)
 
-    num_processos = 4
     blocos = np.array_split(df, num_processos)
 
-    with mp.Pool(processes=num_processos) as pool:
-        resultados_parciais = pool.map(agregacoes_por_bloco, blocos)
+    pool = obter_pool(num_processos)
+    resultados_parciais = list(pool.map(agregacoes_por_bloco, blocos))
 
     df_concat = pd.concat(resultados_parciais, ignore_index=True)
     agg_final = (
-        df_concat.groupby("Chave")
+        df_concat.groupby("Chave", observed=True)
         .agg({"sum": "sum", "mean": "mean", "std": "mean"})
         .reset_index()
     )
@@ -442,59 +558,39 @@ def nivel2_exercicio9():
     print(agg_final)
 
 
-def processo_transformacao(fila_in, fila_out):
-    while True:
-        bloco = fila_in.get()
-        if bloco is None:
-            print("[Transformação] Recebeu sinal de término. Encerrando.")
-            fila_out.put(None)
-            break
-        df = bloco.copy()
-        df["ValorTransformado"] = df["Valor"] * 2
-        print(f"[Transformação] Transformado bloco com {len(df)} linhas.")
-        fila_out.put(df)
-
-
-def processo_persistencia(fila_out, pasta_saida):
-    contador = 0
-    while True:
-        df_transformado = fila_out.get()
-        if df_transformado is None:
-            print("[Persistência] Recebeu sinal de término. Encerrando.")
-            break
-        nome_arquivo = os.path.join(pasta_saida, f"bloco_transformado_{contador}.csv")
-        df_transformado.to_csv(nome_arquivo, index=False)
-        print(
-            f"[Persistência] Gravado: {nome_arquivo} ({len(df_transformado)} linhas)."
-        )
-        contador += 1
+def transformar_bloco(bloco):
+    df = bloco.copy()
+    df["ValorTransformado"] = df["Valor"] * 2
+    print(f"[Transformação] Transformado bloco com {len(df)} linhas.")
+    return df
 
 
-def nivel2_exercicio10():
+def nivel2_exercicio10(num_blocos=5, tamanho_bloco=20_000):
     """
     10. Multiprocessamento em pipelines: transformação + persistência
-    - Usa multiprocessing.Process e multiprocessing.Queue.
-    - Processo de transformação: recebe DataFrame, multiplica coluna 'Valor' por 2 e envia adiante.
-    - Processo de persistência: recebe DataFrame transformado e grava cada bloco em CSV.
+    - Etapa de transformação (pool de processos compartilhado): recebe DataFrame,
+      multiplica coluna 'Valor' por 2 e devolve.
+    - Etapa de persistência: assim que um bloco é transformado, é enviado a uma
+      SaidaParquet, que grava todos os blocos num único arquivo (um row group por bloco).
     """
-
+    import numpy as np
+    import pyarrow as pa
+    from comum.compactacao import dataframe_compacto
+    from comum.saida import SaidaParquet
+
+    # Esquema fixo: a compactação reduz o ID bloco a bloco (uint16 nos primeiros,
+    # uint32 depois), e o arquivo Parquet precisa de um tipo só para todos.
+    esquema = pa.schema(
+        [("ID", pa.uint32()), ("Valor", pa.float64()), ("ValorTransformado", pa.float64())]
+    )
     pasta_saida = "blocos_transformados"
     os.makedirs(pasta_saida, exist_ok=True)
 
-    fila_in = mp.Queue()
-    fila_out = mp.Queue()
-
-    p_transform = mp.Process(target=processo_transformacao, args=(fila_in, fila_out))
-    p_persist = mp.Process(target=processo_persistencia, args=(fila_out, pasta_saida))
-
-    p_transform.start()
-    p_persist.start()
-
-    num_blocos = 5
-    tamanho_bloco = 20_000
+    pool = obter_pool()
 
+    transformacoes = {}
     for i in range(num_blocos):
-        df = pd.DataFrame(
+        df = dataframe_compacto(
             {
                 "ID": range(i * tamanho_bloco, (i + 1) * tamanho_bloco),
                 "Valor": np.random.random(size=tamanho_bloco) * 100,
@@ -503,12 +599,16 @@ def nivel2_exercicio10():
         print(
             f"[Principal] Enviando bloco {i} com {len(df)} linhas para transformação."
         )
-        fila_in.put(df)
-
-    fila_in.put(None)
+        transformacoes[pool.submit(transformar_bloco, df)] = i
 
-    p_transform.join()
-    p_persist.join()
+    nome_arquivo = os.path.join(pasta_saida, "blocos_transformados.parquet")
+    with SaidaParquet(nome_arquivo, esquema=esquema) as saida:
+        for future in as_completed(transformacoes):
+            df_transformado = future.result()
+            saida.escrever_dataframe(df_transformado)
+            print(
+                f"[Persistência] Bloco {transformacoes[future]} gravado em {nome_arquivo} ({len(df_transformado)} linhas)."
+            )
 
     print("\nPipeline de transformação + persistência concluído. (Exercício 10)")
 
@@ -0,0 +1,99 @@
+import sys
+import time
+import resource
+import tracemalloc
+import multiprocessing as mp
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# ------------------------------------------------------------
+# Benchmark: funcao_complexa original vs kernel em tiles
+# ------------------------------------------------------------
+
+
+def referencia_funcao_complexa(df_slice):
+    # Implementação anterior, mantida só para comparação
+    import numpy as np
+
+    df = df_slice.copy()
+    df["Resultado"] = np.sqrt(df["X"] ** 2 + df["Y"] ** 2) + np.log(
+        df["X"] + df["Y"] + 1
+    )
+    return df
+
+
+def _variante(nome):
+    if nome == "original":
+        return referencia_funcao_complexa
+    from aula_6.atividade_paralelismo import funcao_complexa
+
+    return funcao_complexa
+
+
+def medir_variante(nome, num_linhas, repeticoes):
+    """
+    Executa uma variante num processo novo e mede tempo, banda efetiva e picos de memória.
+    - Banda efetiva: bytes úteis (ler X e Y, escrever Resultado) / tempo.
+    - Pico RSS: aumento do maxrss do processo causado pela função.
+    - Pico alocado: maior volume alocado pelo numpy/pandas durante a chamada (tracemalloc).
+    """
+    import numpy as np
+    import pandas as pd
+
+    funcao = _variante(nome)
+    df = pd.DataFrame(
+        {
+            "X": np.random.uniform(0, 100, size=num_linhas),
+            "Y": np.random.uniform(0, 200, size=num_linhas),
+        }
+    )
+    funcao(df.iloc[:1000])  # aquece imports e caches
+
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(df)
+        melhor = min(melhor, time.perf_counter() - inicio)
+        del resultado
+    _, pico_alocado = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    bytes_uteis = 3 * 8 * num_linhas
+    return {
+        "variante": nome,
+        "tempo_s": melhor,
+        "banda_GBps": bytes_uteis / melhor / 1e9,
+        "pico_rss_MB": (rss_pico - rss_base) / 1024,
+        "pico_alocado_MB": pico_alocado / 1024**2,
+    }
+
+
+def benchmark_funcao_complexa(num_linhas=5_000_000, repeticoes=5):
+    """
+    Compara a funcao_complexa original com a versão em kernels (comum.kernels).
+    Cada variante roda num processo spawn separado para que o pico de RSS de
+    uma não contamine a medição da outra.
+    """
+    resultados = []
+    for nome in ("original", "kernel"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as executor:
+            resultados.append(executor.submit(medir_variante, nome, num_linhas, repeticoes).result())
+
+    print(f"\n=== funcao_complexa com {num_linhas:,} linhas (melhor de {repeticoes}) ===")
+    print(f"{'variante':<10}{'tempo (s)':>12}{'banda (GB/s)':>14}{'pico RSS (MB)':>16}{'pico alocado (MB)':>20}")
+    for r in resultados:
+        print(
+            f"{r['variante']:<10}{r['tempo_s']:>12.4f}{r['banda_GBps']:>14.2f}"
+            f"{r['pico_rss_MB']:>16.1f}{r['pico_alocado_MB']:>20.1f}"
+        )
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark_funcao_complexa()
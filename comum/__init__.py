@@ -0,0 +1,3 @@
+"""
+Utilitários compartilhados entre as aulas (renderização, compactação, HTTP, pools...).
+"""
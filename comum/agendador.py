@@ -0,0 +1,115 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# ------------------------------------------------------------
+# Agendador de tarefas com dependências (DAG)
+# ------------------------------------------------------------
+
+
+class ErroDependencia(Exception):
+    """
+    Levantada quando um nó não pode rodar porque uma dependência falhou.
+    """
+
+
+class Agendador:
+    """
+    Executa um grafo de tarefas com dependências em um ThreadPoolExecutor.
+    - Cada nó tem uma chave; adicionar a mesma chave de novo não cria outro nó,
+      então dependências compartilhadas por vários relatórios rodam uma só vez.
+    - Um nó roda assim que todas as suas dependências terminam, e nós
+      independentes rodam ao mesmo tempo.
+    - A função do nó recebe os resultados das dependências, na ordem declarada.
+    - Se um nó falha, os nós que dependem dele também falham (ErroDependencia),
+      mas o resto do grafo continua.
+    Args:
+        max_workers (int): Nós executados simultaneamente.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._nos = {}
+        self._lock = threading.Lock()
+
+    def adicionar(self, chave, funcao, dependencias=()):
+        """
+        Registra um nó (ou reaproveita o já registrado com a mesma chave).
+        Returns:
+            A chave do nó, para ser usada como dependência de outros nós.
+        """
+        with self._lock:
+            if chave not in self._nos:
+                self._nos[chave] = (funcao, tuple(dependencias))
+        return chave
+
+    def __contains__(self, chave):
+        return chave in self._nos
+
+    def __len__(self):
+        return len(self._nos)
+
+    def _necessarios(self, alvos):
+        # Fecho transitivo das dependências dos alvos, checando chaves e ciclos
+        visitando, necessarios = set(), set()
+
+        def visitar(chave):
+            if chave in necessarios:
+                return
+            if chave not in self._nos:
+                raise KeyError(f"Nó não registrado: {chave!r}")
+            if chave in visitando:
+                raise ValueError(f"Ciclo de dependências em {chave!r}")
+            visitando.add(chave)
+            for dep in self._nos[chave][1]:
+                visitar(dep)
+            visitando.discard(chave)
+            necessarios.add(chave)
+
+        for chave in alvos:
+            visitar(chave)
+        return necessarios
+
+    def executar(self, alvos=None):
+        """
+        Executa os nós necessários para os alvos (por padrão, todos).
+        Returns:
+            tuple[dict, dict, dict]: (resultados, erros, tempos) indexados pela
+            chave do nó; tempos em segundos.
+        """
+        pendentes = self._necessarios(self._nos if alvos is None else alvos)
+        resultados, erros, tempos = {}, {}, {}
+
+        def rodar_no(chave):
+            funcao, dependencias = self._nos[chave]
+            inicio = time.perf_counter()
+            try:
+                return funcao(*(resultados[dep] for dep in dependencias))
+            finally:
+                tempos[chave] = time.perf_counter() - inicio
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            em_execucao = {}
+            while pendentes or em_execucao:
+                for chave in list(pendentes):
+                    dependencias = self._nos[chave][1]
+                    falhas = [dep for dep in dependencias if dep in erros]
+                    if falhas:
+                        erros[chave] = ErroDependencia(f"{chave!r} depende de {falhas[0]!r}, que falhou")
+                        pendentes.discard(chave)
+                    elif all(dep in resultados for dep in dependencias):
+                        em_execucao[executor.submit(rodar_no, chave)] = chave
+                        pendentes.discard(chave)
+
+                if not em_execucao:
+                    continue  # só restaram nós cujas dependências falharam
+                prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for future in prontos:
+                    chave = em_execucao.pop(future)
+                    try:
+                        resultados[chave] = future.result()
+                    except Exception as e:
+                        erros[chave] = e
+
+        return resultados, erros, tempos
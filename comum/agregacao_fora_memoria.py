@@ -0,0 +1,184 @@
+import os
+import pickle
+import shutil
+import tempfile
+
+from concurrent.futures import wait, as_completed, FIRST_COMPLETED
+
+import numpy as np
+import pandas as pd
+
+from comum.pool_aquecido import obter_pool
+
+# ------------------------------------------------------------
+# Group-by fora da memória (particionamento por hash + spill em disco)
+# ------------------------------------------------------------
+
+NUM_PARTICOES = 16
+PARCIAIS_POR_COMBINACAO = 64
+
+
+def estatisticas_parciais(df, chave, valor):
+    """
+    Resume um bloco em (n, media, m2) por chave, onde m2 é a soma dos quadrados
+    dos desvios em relação à média. Esses três valores podem ser combinados
+    entre blocos sem perder precisão (algoritmo de Chan et al.).
+    """
+    grupos = df.groupby(chave, observed=True, sort=False)[valor]
+    n = grupos.count()
+    parcial = pd.DataFrame({"n": n, "media": grupos.mean(), "m2": grupos.var(ddof=0) * n})
+    parcial = parcial[parcial["n"] > 0]
+    if isinstance(parcial.index, pd.CategoricalIndex):
+        # Índice com valores simples: um categórico levaria a lista inteira de
+        # categorias em cada parcial serializado (spill e retorno do worker)
+        parcial.index = pd.Index(np.asarray(parcial.index), name=parcial.index.name)
+    return parcial
+
+
+def combinar_parciais(parciais):
+    """
+    Combina estatísticas parciais (saídas de estatisticas_parciais) da mesma chave.
+    """
+    nivel = parciais.index.name
+    n = parciais["n"].groupby(level=0, observed=True, sort=False).sum()
+    soma = (parciais["n"] * parciais["media"]).groupby(level=0, observed=True, sort=False).sum()
+    media = soma / n
+    delta = parciais["media"].to_numpy() - media.reindex(parciais.index).to_numpy()
+    m2 = (parciais["m2"] + parciais["n"] * delta**2).groupby(level=0, observed=True, sort=False).sum()
+    combinado = pd.DataFrame({"n": n, "media": media, "m2": m2})
+    combinado.index.name = nivel
+    return combinado
+
+
+def _ler_spill(caminho):
+    with open(caminho, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def reduzir_particao(caminho, parciais_por_combinacao=PARCIAIS_POR_COMBINACAO):
+    """
+    Lê o arquivo de spill de uma partição e combina os parciais em lotes,
+    mantendo em memória no máximo `parciais_por_combinacao` blocos por vez.
+    Executado nos workers.
+    """
+    acumulado = None
+    lote = []
+    for parcial in _ler_spill(caminho):
+        lote.append(parcial)
+        if len(lote) >= parciais_por_combinacao:
+            acumulado = combinar_parciais(pd.concat(([acumulado] if acumulado is not None else []) + lote))
+            lote = []
+    if lote:
+        acumulado = combinar_parciais(pd.concat(([acumulado] if acumulado is not None else []) + lote))
+    return acumulado
+
+
+def agregar_fora_memoria(blocos, chave, valor, num_particoes=NUM_PARTICOES, pasta_spill=None, pool=None, blocos_em_voo=None):
+    """
+    Calcula soma, média e desvio padrão de `valor` por `chave` sem carregar a
+    entrada inteira na memória.
+    - Cada bloco lido é resumido em (n, média, m2) por chave nos workers do
+      pool; conforme os resumos chegam, suas linhas são distribuídas por hash
+      da chave em `num_particoes` arquivos.
+    - Cada partição é reduzida em paralelo no pool compartilhado.
+    A memória usada fica limitada a `blocos_em_voo` blocos (na leitura) e ao
+    número de chaves de uma partição (na redução).
+    Args:
+        blocos (iterable[pd.DataFrame]): Blocos da entrada (ver blocos_de_arquivo).
+        chave (str): Coluna de agrupamento.
+        valor (str): Coluna agregada.
+        num_particoes (int): Número de partições/arquivos de spill.
+        pasta_spill (str): Pasta para os arquivos temporários; se omitida, usa
+            uma pasta temporária que é apagada no final.
+        pool: Executor para resumos e redução; por padrão o pool compartilhado.
+        blocos_em_voo (int): Blocos enviados ao pool e ainda não gravados
+            (padrão: 2 por worker).
+    Returns:
+        pd.DataFrame: Colunas chave, sum, mean e std (amostral), ordenado pela chave.
+    """
+    temporaria = pasta_spill is None
+    pasta = tempfile.mkdtemp(prefix="spill_") if temporaria else pasta_spill
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = {}
+    pool = pool or obter_pool()
+    limite = blocos_em_voo or 2 * getattr(pool, "max_workers", os.cpu_count() or 1)
+
+    def gravar(parcial):
+        particoes = pd.util.hash_pandas_object(parcial.index, index=False).to_numpy() % num_particoes
+        for p in np.unique(particoes):
+            if p not in arquivos:
+                # "wb": sobrescreve spill de execuções anteriores na mesma pasta
+                arquivos[p] = open(os.path.join(pasta, f"particao_{p}.pkl"), "wb")
+            pickle.dump(parcial[particoes == p], arquivos[p], protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        linhas = 0
+        em_voo = set()
+        for bloco in blocos:
+            linhas += len(bloco)
+            em_voo.add(pool.submit(estatisticas_parciais, bloco, chave, valor))
+            if len(em_voo) >= limite:
+                prontos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                for future in prontos:
+                    gravar(future.result())
+        for future in as_completed(em_voo):
+            gravar(future.result())
+        for f in arquivos.values():
+            f.close()
+
+        # Só as partições gravadas nesta execução
+        caminhos = [arquivos[p].name for p in sorted(arquivos)]
+        print(f"[Fora da memória] {linhas} linhas lidas, {len(caminhos)} partições em '{pasta}'.")
+        resultados = [r for r in pool.map(reduzir_particao, caminhos) if r is not None]
+    finally:
+        for f in arquivos.values():
+            f.close()
+        if temporaria:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    if not resultados:
+        return pd.DataFrame(columns=[chave, "sum", "mean", "std"])
+    final = pd.concat(resultados)
+    std = np.sqrt(final["m2"] / (final["n"] - 1)).where(final["n"] > 1)
+    agg = pd.DataFrame(
+        {"sum": final["media"] * final["n"], "mean": final["media"], "std": std}
+    )
+    agg.index.name = chave
+    return agg.sort_index().reset_index()
+
+
+def blocos_de_arquivo(caminho, tamanho_bloco=100_000, colunas=None):
+    """
+    Lê um CSV ou Parquet em blocos de `tamanho_bloco` linhas.
+    Yields:
+        pd.DataFrame: Um bloco por vez.
+    """
+    if caminho.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco, usecols=colunas)
+
+
+def conferir_agregacao(resultado, df, chave, valor, tolerancia=1e-9):
+    """
+    Compara o resultado de agregar_fora_memoria com groupby().agg(["sum", "mean", "std"])
+    em memória sobre o mesmo DataFrame.
+    Raises:
+        AssertionError: Se chaves ou valores divergirem além da tolerância.
+    """
+    esperado = df.groupby(chave, observed=True)[valor].agg(["sum", "mean", "std"])
+    obtido = resultado.set_index(chave)[["sum", "mean", "std"]]
+    # Mesmo tipo de índice (categórico vs object) e mesma ordem nos dois lados
+    esperado.index = esperado.index.astype(object)
+    obtido.index = obtido.index.astype(object)
+    pd.testing.assert_frame_equal(
+        obtido.sort_index(), esperado.sort_index(), check_dtype=False, check_names=False, rtol=tolerancia
+    )
@@ -0,0 +1,98 @@
+import pandas as pd
+
+# ------------------------------------------------------------
+# Compactação automática de dtypes
+# ------------------------------------------------------------
+
+try:
+    import pyarrow  # noqa: F401
+
+    DTYPE_TEXTO = "string[pyarrow]"
+except ImportError:  # sem pyarrow, cai para o StringDtype em Python
+    DTYPE_TEXTO = "string"
+
+LIMITE_CARDINALIDADE = 0.5
+
+
+def _eh_texto(serie):
+    if isinstance(serie.dtype, pd.StringDtype):
+        return True
+    if serie.dtype != object:
+        return False
+    return pd.api.types.infer_dtype(serie, skipna=True) == "string"
+
+
+def compactar_dataframe(df, limite_cardinalidade=LIMITE_CARDINALIDADE, reduzir_float=False, relatorio=False):
+    """
+    Reduz o uso de memória de um DataFrame convertendo os tipos das colunas.
+    - Textos com poucos valores distintos viram category.
+    - Demais textos passam a usar strings Arrow (string[pyarrow]).
+    - Inteiros são reduzidos ao menor tipo que comporta os valores.
+    - Floats só são reduzidos para float32 se reduzir_float=True (perde precisão).
+    Args:
+        df (pd.DataFrame): DataFrame de entrada (não é modificado).
+        limite_cardinalidade (float): Razão máxima distintos/linhas para virar category.
+        reduzir_float (bool): Se True, converte float64 em float32.
+        relatorio (bool): Se True, imprime o uso de memória antes e depois.
+    Returns:
+        pd.DataFrame: Novo DataFrame com os tipos compactados.
+    """
+    colunas = {}
+    for nome, serie in df.items():
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            colunas[nome] = serie
+        elif _eh_texto(serie):
+            distintos = serie.nunique(dropna=True)
+            if len(serie) and distintos / len(serie) <= limite_cardinalidade:
+                colunas[nome] = serie.astype("category")
+            else:
+                colunas[nome] = serie.astype(DTYPE_TEXTO)
+        elif pd.api.types.is_bool_dtype(serie.dtype):
+            colunas[nome] = serie
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            tipo = "unsigned" if len(serie) and serie.min() >= 0 else "integer"
+            colunas[nome] = pd.to_numeric(serie, downcast=tipo)
+        elif pd.api.types.is_float_dtype(serie.dtype) and reduzir_float:
+            colunas[nome] = pd.to_numeric(serie, downcast="float")
+        else:
+            colunas[nome] = serie
+
+    compactado = pd.DataFrame(colunas, index=df.index)
+    if relatorio:
+        relatorio_memoria(df, compactado)
+    return compactado
+
+
+def relatorio_memoria(antes, depois):
+    """
+    Imprime e retorna o uso de memória por coluna antes e depois da compactação.
+    Args:
+        antes (pd.DataFrame): DataFrame original.
+        depois (pd.DataFrame): DataFrame compactado.
+    Returns:
+        pd.DataFrame: Tabela com dtype e bytes de cada coluna nas duas versões.
+    """
+    tabela = pd.DataFrame(
+        {
+            "dtype_antes": antes.dtypes.astype(str),
+            "bytes_antes": antes.memory_usage(deep=True, index=False),
+            "dtype_depois": depois.dtypes.astype(str),
+            "bytes_depois": depois.memory_usage(deep=True, index=False),
+        }
+    )
+    total_antes = tabela["bytes_antes"].sum()
+    total_depois = tabela["bytes_depois"].sum()
+    reducao = 100 * (1 - total_depois / total_antes) if total_antes else 0.0
+    print(tabela)
+    print(
+        f"Memória: {total_antes / 1024**2:.2f} MB → {total_depois / 1024**2:.2f} MB ({reducao:.1f}% menor)"
+    )
+    return tabela
+
+
+def dataframe_compacto(dados, **kwargs):
+    """
+    Atalho para construir um DataFrame já compactado: dataframe_compacto({...}).
+    Aceita os mesmos argumentos de compactar_dataframe.
+    """
+    return compactar_dataframe(pd.DataFrame(dados), **kwargs)
@@ -0,0 +1,288 @@
+import math
+import time
+import asyncio
+import hashlib
+import tempfile
+
+from urllib.parse import urlsplit
+
+from comum.saida import SaidaJSONL
+
+# ------------------------------------------------------------
+# Crawler assíncrono com fronteira, deduplicação e politeness por host
+# ------------------------------------------------------------
+
+MAX_WORKERS = 200
+MAX_POR_HOST = 50
+TAMANHO_FRONTEIRA = 10_000
+LIMITE_SET_VISTOS = 1_000_000
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom em bytearray: pertinência aproximada em memória fixa.
+    Pode dar falso positivo (URL nova tratada como vista) com probabilidade
+    ~taxa_erro, nunca falso negativo.
+    Args:
+        capacidade (int): Número esperado de itens.
+        taxa_erro (float): Taxa de falso positivo desejada na capacidade.
+    """
+
+    def __init__(self, capacidade, taxa_erro=0.001):
+        self.num_bits = max(8, int(-capacidade * math.log(taxa_erro) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacidade * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _posicoes(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def adicionar(self, item):
+        for pos in self._posicoes(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._posicoes(item))
+
+
+class ConjuntoVistos:
+    """
+    Conjunto de URLs já vistas. Usa um set exato até `limite_set` URLs e,
+    a partir daí, migra para um FiltroBloom (memória fixa).
+    """
+
+    def __init__(self, limite_set=LIMITE_SET_VISTOS, capacidade_bloom=None, taxa_erro=0.001):
+        self.limite_set = limite_set
+        self.capacidade_bloom = capacidade_bloom or limite_set * 20
+        self.taxa_erro = taxa_erro
+        self._set = set()
+        self._bloom = None
+
+    def adicionar_se_novo(self, url):
+        """
+        Returns:
+            bool: True se a URL ainda não tinha sido vista (e agora foi registrada).
+        """
+        if self._bloom is not None:
+            if url in self._bloom:
+                return False
+            self._bloom.adicionar(url)
+            return True
+        if url in self._set:
+            return False
+        self._set.add(url)
+        if len(self._set) > self.limite_set:
+            self._bloom = FiltroBloom(self.capacidade_bloom, self.taxa_erro)
+            for vista in self._set:
+                self._bloom.adicionar(vista)
+            self._set = None
+        return True
+
+
+class _Transbordo:
+    """
+    URLs descobertas que não couberam na fronteira, guardadas (uma por linha)
+    num arquivo temporário e devolvidas à fronteira conforme ela esvazia.
+    """
+
+    def __init__(self):
+        self._arquivo = None
+        self._pos_leitura = 0
+        self.pendentes = 0
+
+    def guardar(self, url):
+        if self._arquivo is None:
+            self._arquivo = tempfile.TemporaryFile("w+b")
+        self._arquivo.seek(0, 2)
+        self._arquivo.write(url.encode("utf-8") + b"\n")
+        self.pendentes += 1
+
+    def retirar(self):
+        self._arquivo.seek(self._pos_leitura)
+        url = self._arquivo.readline()[:-1].decode("utf-8")
+        self._pos_leitura = self._arquivo.tell()
+        self.pendentes -= 1
+        if not self.pendentes:  # tudo lido: reaproveita o arquivo do início
+            self._arquivo.seek(0)
+            self._arquivo.truncate()
+            self._pos_leitura = 0
+        return url
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+
+class _EstadoHost:
+    def __init__(self, max_por_host):
+        self.semaforo = asyncio.Semaphore(max_por_host)
+        self.lock = asyncio.Lock()
+        self.proximo_inicio = 0.0
+
+
+class Crawler:
+    """
+    Crawler assíncrono com número fixo de workers.
+    - Fronteira: fila limitada; as sementes são consumidas sob demanda, então
+      um iterável com milhões de URLs não é carregado na memória.
+    - Deduplicação: ConjuntoVistos (set → filtro de Bloom).
+    - Politeness: no máximo max_por_host requisições simultâneas por host e
+      intervalo mínimo de atraso_host segundos entre inícios no mesmo host.
+    - Resultados: gravados em lote numa SaidaJSONL à medida que chegam.
+    Args:
+        caminho_saida (str): Arquivo JSONL de resultados (".gz"/".zst" comprime).
+        max_workers (int): Requisições simultâneas no total.
+        max_por_host (int): Requisições simultâneas por host.
+        atraso_host (float): Segundos entre inícios de requisição no mesmo host.
+        tamanho_fronteira (int): Capacidade da fila de URLs pendentes.
+        timeout (float): Timeout total de cada requisição.
+        bytes_conteudo (int): Quantos bytes do corpo guardar no resultado.
+        extrair_links (callable): Opcional. extrair_links(url, corpo) → URLs
+            novas; as que não couberem na fronteira vão para um arquivo de
+            transbordo e voltam à fronteira quando houver espaço.
+    """
+
+    def __init__(self, caminho_saida, max_workers=MAX_WORKERS, max_por_host=MAX_POR_HOST, atraso_host=0.0, tamanho_fronteira=TAMANHO_FRONTEIRA, timeout=10, bytes_conteudo=100, extrair_links=None, vistos=None):
+        self.caminho_saida = caminho_saida
+        self.max_workers = max_workers
+        self.max_por_host = max_por_host
+        self.atraso_host = atraso_host
+        self.tamanho_fronteira = tamanho_fronteira
+        self.timeout = timeout
+        self.bytes_conteudo = bytes_conteudo
+        self.extrair_links = extrair_links
+        self.vistos = vistos or ConjuntoVistos()
+        self._hosts = {}
+        self._transbordo = None
+        self.estatisticas = {"ok": 0, "erros": 0, "bytes": 0, "duplicadas": 0, "transbordadas": 0, "erros_links": 0}
+
+    def _estado_host(self, host):
+        estado = self._hosts.get(host)
+        if estado is None:
+            estado = self._hosts[host] = _EstadoHost(self.max_por_host)
+        return estado
+
+    async def _aguardar_politeness(self, estado):
+        if not self.atraso_host:
+            return
+        async with estado.lock:
+            agora = time.monotonic()
+            espera = estado.proximo_inicio - agora
+            if espera > 0:
+                await asyncio.sleep(espera)
+            estado.proximo_inicio = max(agora, estado.proximo_inicio) + self.atraso_host
+
+    def _enfileirar(self, fronteira, url):
+        # A URL só é marcada como vista porque nunca é perdida: ou entra na
+        # fronteira ou fica no transbordo até haver espaço
+        if not self.vistos.adicionar_se_novo(url):
+            self.estatisticas["duplicadas"] += 1
+            return
+        if self._transbordo.pendentes or fronteira.full():
+            self._transbordo.guardar(url)
+            self.estatisticas["transbordadas"] += 1
+        else:
+            fronteira.put_nowait(url)
+
+    def _reabastecer(self, fronteira):
+        while self._transbordo.pendentes and not fronteira.full():
+            fronteira.put_nowait(self._transbordo.retirar())
+
+    async def _buscar(self, sessao, url, saida):
+        estado = self._estado_host(urlsplit(url).netloc)
+        async with estado.semaforo:
+            await self._aguardar_politeness(estado)
+            inicio = time.perf_counter()
+            try:
+                async with sessao.get(url) as resposta:
+                    corpo = await resposta.read()
+                latencia = time.perf_counter() - inicio
+                registro = {
+                    "url": url,
+                    "status_code": resposta.status,
+                    "latency": latencia,
+                    "bytes": len(corpo),
+                    "conteudo": corpo[: self.bytes_conteudo].decode("utf-8", "replace"),
+                }
+                self.estatisticas["ok"] += 1
+                self.estatisticas["bytes"] += len(corpo)
+            except Exception as e:  # ClientError, timeout ou qualquer outra falha da URL
+                corpo = None
+                registro = {
+                    "url": url,
+                    "status_code": None,
+                    "latency": time.perf_counter() - inicio,
+                    "erro": repr(e),
+                }
+                self.estatisticas["erros"] += 1
+        saida.escrever(registro)
+        return corpo
+
+    async def _worker(self, sessao, fronteira, saida):
+        while True:
+            url = await fronteira.get()
+            try:
+                corpo = await self._buscar(sessao, url, saida)
+                if corpo is not None and self.extrair_links:
+                    for nova in self.extrair_links(url, corpo):
+                        self._enfileirar(fronteira, nova)
+            except Exception as e:
+                # Um erro numa URL (ex.: no extrair_links do usuário) não pode
+                # matar o worker: sem workers, fronteira.join() esperaria para sempre
+                self.estatisticas["erros_links"] += 1
+                saida.escrever({"url": url, "erro_links": repr(e)})
+            finally:
+                # Antes do task_done: fronteira.join() não termina com URLs no transbordo
+                self._reabastecer(fronteira)
+                fronteira.task_done()
+
+    async def executar(self, sementes):
+        """
+        Executa o crawl até esgotar sementes e links descobertos.
+        Args:
+            sementes (iterable[str]): URLs iniciais (pode ser um gerador).
+        Returns:
+            dict: Estatísticas (ok, erros, bytes, duplicadas, transbordadas,
+            erros_links, segundos e urls_por_segundo).
+        """
+        import aiohttp
+
+        fronteira = asyncio.Queue(maxsize=self.tamanho_fronteira)
+        conector = aiohttp.TCPConnector(limit=self.max_workers, limit_per_host=self.max_por_host, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        inicio = time.perf_counter()
+        self._transbordo = _Transbordo()
+
+        with SaidaJSONL(self.caminho_saida) as saida:
+            async with aiohttp.ClientSession(connector=conector, timeout=timeout) as sessao:
+                workers = [
+                    asyncio.create_task(self._worker(sessao, fronteira, saida))
+                    for _ in range(self.max_workers)
+                ]
+                try:
+                    for url in sementes:
+                        if self.vistos.adicionar_se_novo(url):
+                            await fronteira.put(url)  # espera se a fronteira estiver cheia
+                        else:
+                            self.estatisticas["duplicadas"] += 1
+                    await fronteira.join()
+                finally:
+                    for w in workers:
+                        w.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    self._transbordo.fechar()
+
+        segundos = time.perf_counter() - inicio
+        total = self.estatisticas["ok"] + self.estatisticas["erros"]
+        self.estatisticas["segundos"] = segundos
+        self.estatisticas["urls_por_segundo"] = total / segundos if segundos else 0.0
+        return self.estatisticas
+
+
+def crawl(sementes, caminho_saida, **kwargs):
+    """
+    Atalho síncrono: cria um Crawler com `kwargs` e executa sobre as sementes.
+    """
+    return asyncio.run(Crawler(caminho_saida, **kwargs).executar(sementes))
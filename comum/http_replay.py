@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import base64
+import random
+import hashlib
+import threading
+
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# ------------------------------------------------------------
+# Gravação e reprodução de respostas HTTP (benchmarks offline)
+# ------------------------------------------------------------
+
+# Parâmetros removidos da URL antes de gravar: não guardam chaves de API em disco
+# e fazem a mesma requisição casar com chaves diferentes.
+PARAMETROS_SECRETOS = {"key", "apikey", "api_key", "token", "access_token"}
+
+# Perfis de latência injetada: (média, desvio) em segundos
+PERFIS_LATENCIA = {
+    "local": (0.0005, 0.0002),
+    "lan": (0.002, 0.001),
+    "internet": (0.080, 0.030),
+    "api_lenta": (0.400, 0.150),
+}
+
+CABECALHOS_DESCARTADOS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+def _url_sem_segredos(url):
+    partes = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if k.lower() not in PARAMETROS_SECRETOS
+    )
+    return urlunsplit((partes.scheme, partes.netloc, partes.path, urlencode(query), ""))
+
+
+def chave_requisicao(metodo, url, corpo=None):
+    """
+    Gera a chave de uma requisição: método + URL normalizada (+ hash do corpo).
+    """
+    chave = f"{metodo.upper()} {_url_sem_segredos(url)}"
+    if corpo:
+        if isinstance(corpo, str):
+            corpo = corpo.encode("utf-8")
+        chave += " " + hashlib.sha1(corpo).hexdigest()[:16]
+    return chave
+
+
+class ArmazemHTTP:
+    """
+    Armazém append-only de respostas em JSONL com índice chave → offset.
+    O índice fica em `<caminho>.idx` e é reconstruído lendo o JSONL se estiver
+    ausente ou desatualizado. Respostas lidas ficam em memória depois da 1ª vez.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.caminho_indice = f"{caminho}.idx"
+        self._lock = threading.Lock()
+        self._memoria = {}
+        self._indice = self._carregar_indice()
+
+    def _carregar_indice(self):
+        if not os.path.exists(self.caminho):
+            return {}
+        tamanho = os.path.getsize(self.caminho)
+        if os.path.exists(self.caminho_indice):
+            with open(self.caminho_indice, encoding="utf-8") as f:
+                salvo = json.load(f)
+            if salvo.get("tamanho") == tamanho:
+                return salvo["offsets"]
+
+        offsets = {}
+        with open(self.caminho, "rb") as f:
+            offset = 0
+            for linha in f:
+                if linha.strip():
+                    offsets[json.loads(linha)["k"]] = offset
+                offset += len(linha)
+        return offsets
+
+    def salvar_indice(self):
+        with self._lock:
+            if not os.path.exists(self.caminho):
+                return
+            with open(self.caminho_indice, "w", encoding="utf-8") as f:
+                json.dump({"tamanho": os.path.getsize(self.caminho), "offsets": self._indice}, f)
+
+    def __contains__(self, chave):
+        return chave in self._indice
+
+    def __len__(self):
+        return len(self._indice)
+
+    def ler(self, chave):
+        registro = self._memoria.get(chave)
+        if registro is not None:
+            return registro
+        offset = self._indice.get(chave)
+        if offset is None:
+            return None
+        with open(self.caminho, "rb") as f:
+            f.seek(offset)
+            registro = json.loads(f.readline())
+        self._memoria[chave] = registro
+        return registro
+
+    def gravar(self, registro):
+        linha = (json.dumps(registro, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.caminho, "ab") as f:
+                offset = f.tell()
+                f.write(linha)
+            self._indice[registro["k"]] = offset
+            self._memoria[registro["k"]] = registro
+
+
+def _sortear_latencia(latencia, host, registro):
+    if isinstance(latencia, dict):
+        latencia = latencia.get(host, latencia.get("*"))
+    if latencia is None:
+        return 0.0
+    if latencia == "gravada":
+        return registro.get("t", 0.0)
+    if isinstance(latencia, str):
+        latencia = PERFIS_LATENCIA[latencia]
+    if isinstance(latencia, (int, float)):
+        return float(latencia)
+    media, desvio = latencia
+    return max(0.0, random.gauss(media, desvio))
+
+
+class AdaptadorReplay(BaseAdapter):
+    """
+    Adaptador do requests que grava e/ou reproduz respostas de um ArmazemHTTP.
+    Args:
+        armazem (ArmazemHTTP): Onde as respostas são guardadas.
+        modo (str): "gravar" (sempre vai à rede e grava), "reproduzir" (nunca
+            acessa a rede; falha se a resposta não estiver gravada) ou "auto"
+            (reproduz se houver gravação, senão grava).
+        latencia: Latência injetada na reprodução. None (nenhuma), "gravada"
+            (a medida na gravação), nome de PERFIS_LATENCIA, segundos fixos,
+            tupla (média, desvio) ou dict host → um desses (use "*" como padrão).
+    """
+
+    def __init__(self, armazem, modo="auto", latencia=None):
+        super().__init__()
+        if modo not in ("gravar", "reproduzir", "auto"):
+            raise ValueError(f"Modo inválido: {modo}")
+        self.armazem = armazem
+        self.modo = modo
+        self.latencia = latencia
+        self._rede = HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        chave = chave_requisicao(request.method, request.url, request.body)
+
+        if self.modo != "gravar" and chave in self.armazem:
+            registro = self.armazem.ler(chave)
+            espera = _sortear_latencia(self.latencia, urlsplit(request.url).hostname, registro)
+            if espera:
+                time.sleep(espera)
+            return self._montar_resposta(request, registro, espera)
+
+        if self.modo == "reproduzir":
+            raise requests.ConnectionError(f"Sem gravação para {chave}", request=request)
+
+        inicio = time.perf_counter()
+        resposta = self._rede.send(request, **kwargs)
+        conteudo = resposta.content
+        duracao = time.perf_counter() - inicio
+        registro = {
+            "k": chave,
+            "s": resposta.status_code,
+            "r": resposta.reason,
+            "h": {
+                k: v for k, v in resposta.headers.items()
+                if k.lower() not in CABECALHOS_DESCARTADOS
+            },
+            "t": round(duracao, 6),
+        }
+        try:
+            registro["b"] = conteudo.decode("utf-8")
+        except UnicodeDecodeError:
+            registro["b64"] = base64.b64encode(conteudo).decode("ascii")
+        self.armazem.gravar(registro)
+        return resposta
+
+    def _montar_resposta(self, request, registro, espera):
+        resposta = requests.Response()
+        resposta.status_code = registro["s"]
+        resposta.reason = registro.get("r")
+        resposta.headers = CaseInsensitiveDict(registro["h"])
+        if "b64" in registro:
+            resposta._content = base64.b64decode(registro["b64"])
+        else:
+            resposta._content = registro["b"].encode("utf-8")
+        resposta._content_consumed = True
+        resposta.encoding = requests.utils.get_encoding_from_headers(resposta.headers)
+        resposta.url = request.url
+        resposta.request = request
+        resposta.elapsed = timedelta(seconds=espera)
+        return resposta
+
+    def close(self):
+        self._rede.close()
+
+
+@contextmanager
+def ativar_replay(caminho, modo="auto", latencia=None):
+    """
+    Faz todas as requisições do `requests` (inclusive requests.get) passarem
+    pelo AdaptadorReplay enquanto o bloco `with` estiver ativo.
+    Args:
+        caminho (str): Arquivo JSONL das gravações.
+        modo (str): "gravar", "reproduzir" ou "auto".
+        latencia: Perfil de latência injetada (ver AdaptadorReplay).
+    Yields:
+        AdaptadorReplay: O adaptador instalado.
+    Observação:
+        Vale só para o processo atual (e filhos criados por fork depois da
+        ativação, que podem ler mas não devem gravar no mesmo arquivo).
+    """
+    armazem = ArmazemHTTP(caminho)
+    adaptador = AdaptadorReplay(armazem, modo, latencia)
+    original = requests.Session.get_adapter
+
+    def get_adapter(sessao, url):
+        if url.lower().startswith(("http://", "https://")):
+            return adaptador
+        return original(sessao, url)
+
+    requests.Session.get_adapter = get_adapter
+    try:
+        yield adaptador
+    finally:
+        requests.Session.get_adapter = original
+        armazem.salvar_indice()
+        adaptador.close()
@@ -0,0 +1,160 @@
+import os
+import atexit
+import resource
+import threading
+import multiprocessing as mp
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# ------------------------------------------------------------
+# Pool de processos persistente e "aquecido" (forkserver)
+# ------------------------------------------------------------
+
+# Importados uma única vez no servidor forkserver; os workers nascem por fork
+# dele e já encontram esses módulos carregados (os ausentes são ignorados).
+# matplotlib entra sem o pyplot: o backend Agg é escolhido no worker
+# (comum.renderizacao) antes de importar o pyplot.
+MODULOS_PRE_CARREGADOS = ["numpy", "pandas", "matplotlib"]
+MAX_TAREFAS_POR_WORKER = 200
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _executar_medindo(fn, args, kwargs):
+    """
+    Executa a tarefa no worker e devolve também o pico de memória (MB) do processo.
+    """
+    resultado = fn(*args, **kwargs)
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return resultado, pico_mb
+
+
+class PoolAquecido:
+    """
+    Pool de processos de vida longa para ser compartilhado entre exercícios.
+    - Usa o contexto forkserver com pandas/numpy pré-carregados, então criar
+      um worker custa um fork, não um novo interpretador + imports.
+    - Os workers são reciclados em gerações: depois de max_tarefas_por_worker
+      tarefas por worker (em média), ou se algum worker passar de
+      limite_memoria_mb, as próximas tarefas vão para um executor novo e o
+      antigo termina as que já recebeu e é encerrado.
+      (O max_tasks_per_child do ProcessPoolExecutor trava no Python 3.11
+      com forkserver/spawn, por isso a reciclagem é feita aqui.)
+    Args:
+        max_workers (int): Número de processos.
+        max_tarefas_por_worker (int): Tarefas por worker antes de reciclar.
+        limite_memoria_mb (float): Pico de RSS por worker que dispara a reciclagem.
+        pre_carregar (list[str]): Módulos importados no forkserver.
+        metodo_inicio (str): "forkserver" (padrão) ou outro método do multiprocessing.
+    """
+
+    def __init__(self, max_workers=None, max_tarefas_por_worker=MAX_TAREFAS_POR_WORKER, limite_memoria_mb=None, pre_carregar=None, metodo_inicio="forkserver"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tarefas_por_worker = max_tarefas_por_worker
+        self.limite_memoria_mb = limite_memoria_mb
+        self._contexto = mp.get_context(metodo_inicio)
+        if metodo_inicio == "forkserver":
+            self._contexto.set_forkserver_preload(pre_carregar or MODULOS_PRE_CARREGADOS)
+        self._lock = threading.Lock()
+        self._tarefas = 0
+        self._executor = self._novo_executor()
+
+    def _novo_executor(self):
+        self._tarefas = 0
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._contexto)
+
+    def _reciclar(self, executor_antigo):
+        with self._lock:
+            if self._executor is not executor_antigo:
+                return  # outra tarefa já trocou o pool
+            self._executor = self._novo_executor()
+        executor_antigo.shutdown(wait=False)
+
+    def _executor_atual(self):
+        with self._lock:
+            executor = self._executor
+            limite = self.max_tarefas_por_worker
+            if limite and self._tarefas >= limite * self.max_workers:
+                self._executor = self._novo_executor()
+            else:
+                self._tarefas += 1
+                return executor
+        executor.shutdown(wait=False)
+        return self._executor_atual()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Envia uma tarefa ao pool (mesma interface do Executor.submit).
+        Returns:
+            Future: Futuro com o resultado de fn(*args, **kwargs).
+        """
+        externo = Future()
+        executor = self._executor_atual()
+        try:
+            interno = executor.submit(_executar_medindo, fn, args, kwargs)
+        except BrokenProcessPool:
+            self._reciclar(executor)
+            executor = self._executor_atual()
+            interno = executor.submit(_executar_medindo, fn, args, kwargs)
+
+        def concluir(futuro):
+            try:
+                resultado, pico_mb = futuro.result()
+            except BrokenProcessPool as e:
+                self._reciclar(executor)
+                externo.set_exception(e)
+                return
+            except BaseException as e:
+                externo.set_exception(e)
+                return
+            if self.limite_memoria_mb and pico_mb > self.limite_memoria_mb:
+                self._reciclar(executor)
+            externo.set_result(resultado)
+
+        interno.add_done_callback(concluir)
+        return externo
+
+    def map(self, fn, *iteraveis):
+        """
+        Equivalente a Executor.map: resultados na ordem das entradas.
+        """
+        futures = [self.submit(fn, *args) for args in zip(*iteraveis)]
+        return (future.result() for future in futures)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._executor.shutdown(wait=wait)
+
+
+def obter_pool(max_workers=None, **kwargs):
+    """
+    Retorna o pool compartilhado do processo, criando-o na primeira chamada.
+    Se for pedido mais workers do que o pool atual tem, ele é recriado maior;
+    pedidos menores reaproveitam o pool existente.
+    Args:
+        max_workers (int): Número mínimo de workers desejado.
+        **kwargs: Demais argumentos de PoolAquecido (usados só na criação).
+    Returns:
+        PoolAquecido: O pool compartilhado.
+    """
+    global _pool
+    with _lock:
+        if _pool is not None and max_workers and max_workers > _pool.max_workers:
+            _pool.shutdown(wait=True)
+            _pool = None
+        if _pool is None:
+            _pool = PoolAquecido(max_workers, **kwargs)
+        return _pool
+
+
+def encerrar_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+atexit.register(encerrar_pool)
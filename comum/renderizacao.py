@@ -0,0 +1,187 @@
+import os
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from comum.pool_aquecido import obter_pool
+
+# ------------------------------------------------------------
+# Renderização de gráficos em lote (headless e em paralelo)
+# ------------------------------------------------------------
+
+PASTA_GRAFICOS = "graficos"
+MAX_PONTOS_DISPERSAO = 50_000
+BINS_DISPERSAO = 200
+
+
+_backend_configurado = False
+
+
+def _inicializar_worker():
+    """
+    Configura o backend não interativo do matplotlib uma única vez por processo
+    (os workers do pool compartilhado vivem entre chamadas).
+    """
+    global _backend_configurado
+    if _backend_configurado:
+        return
+    os.environ["MPLBACKEND"] = "Agg"
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401  (pré-carrega o pyplot no worker)
+
+    _backend_configurado = True
+
+
+def hash_grafico(spec):
+    """
+    Calcula o hash do gráfico a partir dos dados e dos parâmetros da spec.
+    Args:
+        spec (dict): Especificação do gráfico (ver renderizar_graficos).
+    Returns:
+        str: Hash hexadecimal SHA-256 que identifica a saída renderizada.
+    """
+    h = hashlib.sha256()
+    dados = spec["dados"]
+    if isinstance(dados, pd.DataFrame):
+        h.update(",".join(map(str, dados.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(dados, index=True).values.tobytes())
+    parametros = {k: v for k, v in spec.items() if k != "dados"}
+    h.update(json.dumps(parametros, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _reduzir_dispersao(spec):
+    """
+    Prepara um gráfico de dispersão no processo principal: calcula a regressão
+    sobre todos os pontos e, se houver pontos demais, amostra ou agrupa em bins
+    antes de enviar ao worker (menos dados serializados, render mais rápido).
+    """
+    df = spec["dados"][[spec["x"], spec["y"]]].dropna()
+    x = df[spec["x"]].to_numpy(dtype=float)
+    y = df[spec["y"]].to_numpy(dtype=float)
+
+    reduzida = {k: v for k, v in spec.items() if k != "dados"}
+    if spec.get("regressao") and len(x) > 1:
+        reduzida["coeficientes"] = np.polyfit(x, y, 1).tolist()
+        reduzida["limites_x"] = [float(x.min()), float(x.max())]
+
+    max_pontos = spec.get("max_pontos", MAX_PONTOS_DISPERSAO)
+    if len(x) <= max_pontos:
+        reduzida["x_valores"], reduzida["y_valores"] = x, y
+    elif spec.get("reducao", "binning") == "amostragem":
+        idx = np.random.default_rng(0).choice(len(x), size=max_pontos, replace=False)
+        reduzida["x_valores"], reduzida["y_valores"] = x[idx], y[idx]
+    else:
+        bins = spec.get("bins", BINS_DISPERSAO)
+        contagens, bordas_x, bordas_y = np.histogram2d(x, y, bins=bins)
+        reduzida["histograma"] = (contagens, bordas_x, bordas_y)
+    return reduzida
+
+
+def _preparar(spec):
+    if spec["tipo"] == "dispersao":
+        return _reduzir_dispersao(spec)
+    reduzida = {k: v for k, v in spec.items() if k != "dados"}
+    dados = spec["dados"]
+    if isinstance(dados, pd.DataFrame):
+        dados = dados.set_index(spec["x"])[spec["y"]]
+    reduzida["rotulos"] = [str(r) for r in dados.index]
+    reduzida["valores"] = dados.to_numpy(dtype=float)
+    return reduzida
+
+
+def _renderizar(spec, caminho):
+    """
+    Desenha um gráfico já reduzido e salva em disco. Executado nos workers.
+    """
+    _inicializar_worker()
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=spec.get("tamanho", (8, 6)))
+    try:
+        tipo = spec["tipo"]
+        if tipo == "pizza":
+            ax.pie(spec["valores"], labels=spec["rotulos"], autopct="%1.1f%%")
+        elif tipo == "barras":
+            ax.bar(spec["rotulos"], spec["valores"])
+        elif tipo == "linha":
+            ax.plot(spec["rotulos"], spec["valores"])
+        elif tipo == "dispersao":
+            if "histograma" in spec:
+                contagens, bordas_x, bordas_y = spec["histograma"]
+                malha = ax.pcolormesh(
+                    bordas_x, bordas_y, np.ma.masked_equal(contagens.T, 0), cmap="viridis"
+                )
+                fig.colorbar(malha, ax=ax, label="pontos")
+            else:
+                ax.scatter(spec["x_valores"], spec["y_valores"], s=12)
+            if "coeficientes" in spec:
+                xs = np.linspace(*spec["limites_x"], 100)
+                ax.plot(xs, np.polyval(spec["coeficientes"], xs), color="red")
+        else:
+            raise ValueError(f"Tipo de gráfico desconhecido: {tipo}")
+
+        ax.set_title(spec.get("titulo", ""))
+        if spec.get("xlabel"):
+            ax.set_xlabel(spec["xlabel"])
+        if spec.get("ylabel"):
+            ax.set_ylabel(spec["ylabel"])
+
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        fig.savefig(temporario, format=spec.get("formato", "png"), bbox_inches="tight")
+        os.replace(temporario, caminho)
+    finally:
+        plt.close(fig)
+    return caminho
+
+
+def renderizar_graficos(specs, pasta=PASTA_GRAFICOS, max_workers=None):
+    """
+    Renderiza uma lista de gráficos em PNG/SVG no pool de processos
+    compartilhado (comum.pool_aquecido), com backend não interativo (Agg).
+    Args:
+        specs (list[dict]): Especificações dos gráficos. Chaves principais:
+            nome, tipo ("pizza", "barras", "linha" ou "dispersao"), dados
+            (DataFrame ou Series), x, y, titulo, xlabel, ylabel, formato
+            ("png" ou "svg"), regressao (bool, só dispersão), reducao
+            ("binning" ou "amostragem") e max_pontos.
+        pasta (str): Pasta de saída; também funciona como cache.
+        max_workers (int): Número mínimo de processos do pool compartilhado.
+    Returns:
+        list[str]: Caminhos dos arquivos gerados, na mesma ordem das specs.
+    Observação:
+        A saída é nomeada pelo hash dos dados de entrada; se o arquivo já
+        existir o gráfico não é renderizado de novo.
+    """
+    os.makedirs(pasta, exist_ok=True)
+
+    caminhos = []
+    pendentes = []
+    for spec in specs:
+        formato = spec.get("formato", "png")
+        nome = spec.get("nome", spec["tipo"])
+        caminho = os.path.join(pasta, f"{nome}_{hash_grafico(spec)[:16]}.{formato}")
+        caminhos.append(caminho)
+        if not os.path.exists(caminho):
+            pendentes.append((spec, caminho))
+
+    if pendentes:
+        # Pool persistente (forkserver, com matplotlib pré-carregado): chamadas
+        # repetidas não pagam a criação do pool nem os imports de novo, e é
+        # seguro chamar de threads (ex.: agendador da aula 4)
+        pool = obter_pool(max_workers)
+        futures = [
+            pool.submit(_renderizar, _preparar(spec), caminho)
+            for spec, caminho in pendentes
+        ]
+        for future in futures:
+            future.result()
+
+    print(
+        f"Gráficos: {len(pendentes)} renderizados, {len(specs) - len(pendentes)} do cache (pasta '{pasta}')"
+    )
+    return caminhos
@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unicodedata
+
+from concurrent.futures import Future
+
+# ------------------------------------------------------------
+# Resolução cidade → (cidade, estado, país) no formato da AirVisual
+# ------------------------------------------------------------
+
+CAMINHO_CACHE = "cache_airvisual.json"
+# Espera antes de refazer listagens que falharam; dobra a cada nova falha
+INTERVALO_RETENTATIVA = 60.0
+INTERVALO_RETENTATIVA_MAXIMO = 3600.0
+# Espaçamento mínimo entre listagens (/v2/countries, /v2/states, /v2/cities)
+# para não estourar o limite de requisições por minuto da API
+INTERVALO_LISTAGENS = 1.0
+
+SQL_CIDADES_SAKILA = """
+SELECT ci.city, co.country
+FROM city ci
+JOIN country co ON ci.country_id = co.country_id
+"""
+
+# Nomes de países (já normalizados) que diferem dos usados pela AirVisual
+ALIASES_PAISES = {
+    # Sakila
+    "united states": "USA",
+    "russian federation": "Russia",
+    "yugoslavia": "Serbia",
+    "runion": "Reunion",
+    "congo, the democratic republic of the": "Democratic Republic of the Congo",
+    "virgin islands, u.s.": "U.S. Virgin Islands",
+    "holy see (vatican city state)": "Vatican City",
+    # WeatherAPI (location.country), usado pelo enriquecimento da aula 2
+    "united states of america": "USA",
+    "united kingdom of great britain and northern ireland": "United Kingdom",
+    "viet nam": "Vietnam",
+    "korea, republic of": "South Korea",
+    "iran, islamic republic of": "Iran",
+    "czechia": "Czech Republic",
+    "turkiye": "Turkey",
+    "democratic republic of congo": "Democratic Republic of the Congo",
+}
+
+
+def normalizar(nome):
+    """
+    Normaliza um nome para comparação: sem acentos, minúsculo e sem espaços extras.
+    """
+    sem_acento = unicodedata.normalize("NFKD", str(nome))
+    sem_acento = "".join(c for c in sem_acento if not unicodedata.combining(c))
+    return " ".join(sem_acento.replace("-", " ").casefold().split())
+
+
+def _nomes(resposta, campo):
+    if not resposta or resposta.get("status") != "success":
+        return None
+    return [item[campo] for item in resposta.get("data", [])]
+
+
+class ResolvedorCidades:
+    """
+    Mantém um índice, persistido em disco, das cidades suportadas pela AirVisual.
+    Cada país é indexado (estados e cidades) só na primeira vez que uma cidade dele
+    é pedida; depois disso a resolução não faz nenhuma requisição. Se parte das
+    listagens falhar (ex.: 429), o índice parcial é mantido e só os estados que
+    faltaram são refeitos, depois de um intervalo que dobra a cada falha.
+    Concorrência: o lock cobre só o estado em memória. As listagens rodam fora
+    dele, um único thread indexa cada país (os outros esperam por ele) e
+    cidades já indexadas resolvem sem esperar ninguém. As chamadas às
+    listagens são espaçadas por `intervalo_listagens` e, depois de uma falha,
+    ficam suspensas por `intervalo_retentativa` segundos.
+    Args:
+        listar_paises (callable): Retorna o JSON de /v2/countries.
+        listar_estados (callable): Recebe o país e retorna o JSON de /v2/states.
+        listar_cidades (callable): Recebe estado e país e retorna o JSON de /v2/cities.
+        run_query (callable): Opcional. Executa SQL na Sakila; usado para descobrir
+            o país de cada cidade quando ele não é informado.
+        caminho_cache (str): Arquivo JSON onde o índice é salvo.
+        intervalo_retentativa (float): Segundos até a 1ª nova tentativa de uma
+            listagem que falhou.
+        intervalo_listagens (float): Segundos mínimos entre duas listagens.
+    """
+
+    def __init__(self, listar_paises, listar_estados, listar_cidades, run_query=None, caminho_cache=CAMINHO_CACHE, intervalo_retentativa=INTERVALO_RETENTATIVA, intervalo_listagens=INTERVALO_LISTAGENS):
+        self.listar_paises = listar_paises
+        self.listar_estados = listar_estados
+        self.listar_cidades = listar_cidades
+        self.run_query = run_query
+        self.caminho_cache = caminho_cache
+        self.intervalo_retentativa = intervalo_retentativa
+        self.intervalo_listagens = intervalo_listagens
+        self._lock = threading.Lock()
+        self._lock_sakila = threading.Lock()
+        self._lock_paises = threading.Lock()
+        self._lock_ritmo = threading.Lock()
+        self._indexando = {}
+        self._proxima_listagem = 0.0
+        self._pausa_ate = 0.0
+        self._paises_sakila = None
+        self._falhou_paises = False
+        self._cache = {"paises": None, "indices": {}, "pendentes": {}}
+        if caminho_cache and os.path.exists(caminho_cache):
+            with open(caminho_cache, encoding="utf-8") as f:
+                self._cache = json.load(f)
+            self._cache.setdefault("pendentes", {})
+
+    def _salvar(self):
+        # Chamado com self._lock adquirido
+        if not self.caminho_cache:
+            return
+        # Nome temporário único: outro resolvedor (ou processo) pode estar salvando ao mesmo tempo
+        pasta = os.path.dirname(os.path.abspath(self.caminho_cache))
+        descritor, temporario = tempfile.mkstemp(prefix=os.path.basename(self.caminho_cache) + ".", suffix=".tmp", dir=pasta)
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f, ensure_ascii=False)
+            os.replace(temporario, self.caminho_cache)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def _em_pausa(self):
+        with self._lock_ritmo:
+            return time.monotonic() < self._pausa_ate
+
+    def _listar(self, funcao, *args, campo):
+        """
+        Chama uma listagem respeitando o ritmo mínimo. Uma falha (provavelmente
+        429) suspende todas as listagens por intervalo_retentativa segundos;
+        durante a pausa, retorna None sem chamar a API.
+        """
+        with self._lock_ritmo:
+            agora = time.monotonic()
+            if agora < self._pausa_ate:
+                return None
+            espera = self._proxima_listagem - agora
+            self._proxima_listagem = max(agora, self._proxima_listagem) + self.intervalo_listagens
+        if espera > 0:
+            time.sleep(espera)
+        nomes = _nomes(funcao(*args), campo)
+        if nomes is None:
+            with self._lock_ritmo:
+                self._pausa_ate = time.monotonic() + self.intervalo_retentativa
+        return nomes
+
+    def _pais_da_cidade(self, cidade):
+        if self.run_query is None:
+            return None
+        with self._lock_sakila:
+            if self._paises_sakila is None:
+                df = self.run_query(SQL_CIDADES_SAKILA)
+                self._paises_sakila = {
+                    normalizar(c): str(p) for c, p in zip(df["city"], df["country"])
+                }
+        return self._paises_sakila.get(normalizar(cidade))
+
+    def _pais_airvisual(self, pais):
+        with self._lock_paises:
+            # Uma falha real de /v2/countries não é refeita nesta sessão; uma
+            # chamada pulada por pausa de listagens não conta como falha
+            if self._cache["paises"] is None and not self._falhou_paises and not self._em_pausa():
+                paises = self._listar(self.listar_paises, campo="country")
+                if paises is None:
+                    self._falhou_paises = True
+                else:
+                    with self._lock:
+                        self._cache["paises"] = paises
+                        self._salvar()
+            if self._cache["paises"] is None:
+                return None
+        por_nome = {normalizar(p): p for p in self._cache["paises"]}
+        chave = normalizar(pais)
+        return por_nome.get(chave) or por_nome.get(normalizar(ALIASES_PAISES.get(chave, "")))
+
+    def _pode_tentar(self, pendencia):
+        espera = min(
+            self.intervalo_retentativa * 2 ** (pendencia["tentativas"] - 1),
+            INTERVALO_RETENTATIVA_MAXIMO,
+        )
+        return time.time() - pendencia["falhou_em"] >= espera
+
+    def _baixar_pais(self, pais, pendencia):
+        """
+        Faz as listagens de um país (ou só o que ficou pendente), sem lock.
+        Para na primeira falha: o estado que falhou e os seguintes ficam pendentes.
+        Returns:
+            tuple: (cidades novas {chave: tripla}, estados pendentes ou None se a
+            própria lista de estados falhou; [] se tudo deu certo).
+        """
+        estados = pendencia["estados"] if pendencia else None
+        if estados is None:
+            estados = self._listar(self.listar_estados, pais, campo="state")
+            if estados is None:
+                return {}, None
+        novas = {}
+        for i, estado in enumerate(estados):
+            cidades = self._listar(self.listar_cidades, estado, pais, campo="city")
+            if cidades is None:
+                return novas, estados[i:]
+            for cidade in cidades:
+                novas.setdefault(normalizar(cidade), [cidade, estado, pais])
+        return novas, []
+
+    def _indexar_pais(self, pais):
+        """
+        Indexa um país, mesmo que parcialmente. O que falhou fica em "pendentes"
+        (estados, ou None se a própria lista de estados falhou) e só é refeito
+        quando o intervalo de retentativa passa. Se outro thread já está
+        indexando o país, apenas espera por ele.
+        """
+        with self._lock:
+            pendencia = self._cache["pendentes"].get(pais)
+            if pais in self._cache["indices"] and pendencia is None:
+                return
+            if pendencia is not None and not self._pode_tentar(pendencia):
+                return
+            andamento = self._indexando.get(pais)
+            responsavel = andamento is None
+            if responsavel:
+                andamento = self._indexando[pais] = Future()
+        if not responsavel:
+            andamento.result()
+            return
+
+        try:
+            novas, falhas = self._baixar_pais(pais, pendencia)
+            with self._lock:
+                indice = self._cache["indices"].setdefault(pais, {})
+                for chave, tripla in novas.items():
+                    indice.setdefault(chave, tripla)
+                if falhas == []:
+                    self._cache["pendentes"].pop(pais, None)
+                else:
+                    self._cache["pendentes"][pais] = {
+                        "estados": falhas,
+                        "falhou_em": time.time(),
+                        "tentativas": (pendencia["tentativas"] if pendencia else 0) + 1,
+                    }
+                self._salvar()
+        finally:
+            with self._lock:
+                del self._indexando[pais]
+            andamento.set_result(None)
+
+    def _procurar(self, pais, chave):
+        with self._lock:
+            if pais is None:
+                for indice in self._cache["indices"].values():
+                    if chave in indice:
+                        return indice[chave]
+                return None
+            return self._cache["indices"].get(pais, {}).get(chave)
+
+    def resolver(self, cidade, pais=None):
+        """
+        Retorna a tripla (cidade, estado, país) no formato aceito por /v2/city.
+        Args:
+            cidade (str): Nome da cidade (Sakila, WeatherAPI ou digitado).
+            pais (str): País da cidade; se omitido, é buscado na Sakila.
+        Returns:
+            tuple: (cidade, estado, país) da AirVisual, ou None se não houver dados.
+        """
+        chave = normalizar(cidade)
+        pais = pais or self._pais_da_cidade(cidade)
+        if pais is None:
+            encontrado = self._procurar(None, chave)
+            return tuple(encontrado) if encontrado else None
+
+        pais_av = self._pais_airvisual(pais)
+        if pais_av is None:
+            return None
+        encontrado = self._procurar(pais_av, chave)
+        if encontrado is None:
+            self._indexar_pais(pais_av)
+            encontrado = self._procurar(pais_av, chave)
+        return tuple(encontrado) if encontrado else None
@@ -0,0 +1,218 @@
+import gzip
+import json
+import time
+import threading
+
+# ------------------------------------------------------------
+# Saídas em lote: JSONL (comprimido) e Parquet
+# ------------------------------------------------------------
+
+try:
+    import orjson
+
+    def serializar_json(registro):
+        # default=str como no fallback: Decimal (ex.: amount do psycopg2) vira texto
+        return orjson.dumps(
+            registro, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+        )
+
+except ImportError:  # sem orjson, usa o json da biblioteca padrão
+
+    def serializar_json(registro):
+        return (json.dumps(registro, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+TAMANHO_LOTE = 10_000
+INTERVALO_FLUSH = 5.0
+
+
+def achatar(registro, prefixo="", separador="."):
+    """
+    Achata dicionários aninhados em chaves com ponto ({"a": {"b": 1}} → {"a.b": 1}).
+    Listas viram texto JSON para caberem numa coluna escalar.
+    """
+    plano = {}
+    for chave, valor in registro.items():
+        nome = f"{prefixo}{separador}{chave}" if prefixo else str(chave)
+        if isinstance(valor, dict):
+            plano.update(achatar(valor, nome, separador))
+        elif isinstance(valor, (list, tuple)):
+            plano[nome] = json.dumps(valor, ensure_ascii=False, default=str)
+        else:
+            plano[nome] = valor
+    return plano
+
+
+class _SaidaEmLote:
+    """
+    Base das saídas: acumula registros e grava quando o lote atinge
+    `tamanho_lote` ou quando passam `intervalo_flush` segundos desde a última
+    gravação. O intervalo não é um timer: só é verificado na próxima escrita,
+    então se o produtor parar o último lote fica em memória até flush() ou
+    fechar(). Use como context manager ou chame fechar().
+    """
+
+    def __init__(self, tamanho_lote=TAMANHO_LOTE, intervalo_flush=INTERVALO_FLUSH):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.registros_gravados = 0
+        self._lote = []
+        self._lock = threading.Lock()
+        self._ultimo_flush = time.monotonic()
+
+    def _converter(self, registro):
+        return registro
+
+    def _gravar_lote(self, lote):
+        raise NotImplementedError
+
+    def _fechar_arquivo(self):
+        pass
+
+    def escrever(self, registro):
+        with self._lock:
+            self._lote.append(self._converter(registro))
+            if (
+                len(self._lote) >= self.tamanho_lote
+                or time.monotonic() - self._ultimo_flush >= self.intervalo_flush
+            ):
+                self._flush()
+
+    def escrever_muitos(self, registros):
+        for registro in registros:
+            self.escrever(registro)
+
+    def _flush(self):
+        if self._lote:
+            self._gravar_lote(self._lote)
+            self.registros_gravados += len(self._lote)
+            self._lote = []
+        self._ultimo_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def fechar(self):
+        with self._lock:
+            self._flush()
+            self._fechar_arquivo()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class SaidaJSONL(_SaidaEmLote):
+    """
+    Grava registros como JSON Lines, serializados com orjson (se instalado).
+    Args:
+        caminho (str): Arquivo de saída; ".gz" ativa gzip e ".zst" zstandard.
+        compressao (str): "gzip", "zstd" ou None; sobrepõe a extensão.
+        nivel (int): Nível de compressão (baixo = mais rápido).
+        tamanho_lote (int): Registros por gravação.
+        intervalo_flush (float): Segundos máximos entre gravações.
+    """
+
+    def __init__(self, caminho, compressao="auto", nivel=3, tamanho_lote=TAMANHO_LOTE, intervalo_flush=INTERVALO_FLUSH):
+        super().__init__(tamanho_lote, intervalo_flush)
+        if compressao == "auto":
+            compressao = "gzip" if caminho.endswith(".gz") else "zstd" if caminho.endswith(".zst") else None
+        if compressao == "gzip":
+            self._arquivo = gzip.open(caminho, "wb", compresslevel=nivel)
+        elif compressao == "zstd":
+            import zstandard
+
+            self._bruto = open(caminho, "wb")
+            self._arquivo = zstandard.ZstdCompressor(level=nivel).stream_writer(self._bruto)
+        elif compressao is None:
+            self._arquivo = open(caminho, "wb", buffering=1 << 20)
+        else:
+            raise ValueError(f"Compressão desconhecida: {compressao}")
+
+    def _converter(self, registro):
+        return serializar_json(registro)
+
+    def _gravar_lote(self, lote):
+        self._arquivo.write(b"".join(lote))
+
+    def _fechar_arquivo(self):
+        self._arquivo.close()
+        if getattr(self, "_bruto", None) is not None:
+            self._bruto.close()
+
+
+class SaidaParquet(_SaidaEmLote):
+    """
+    Grava registros (dicts, achatados em colunas) ou DataFrames num único
+    arquivo Parquet, um row group por lote.
+    Args:
+        caminho (str): Arquivo .parquet de saída.
+        esquema (pyarrow.Schema): Esquema fixo; se omitido, é inferido do 1º lote
+            e os lotes seguintes são convertidos para ele (ValueError se um lote
+            não couber, ex.: inteiros compactados bloco a bloco).
+        achatador (callable): Converte cada registro em dict plano
+            (padrão: achatar).
+        compressao (str): Codec do Parquet ("zstd", "snappy", ...).
+        tamanho_lote (int): Registros por row group.
+        intervalo_flush (float): Segundos máximos entre gravações.
+    """
+
+    def __init__(self, caminho, esquema=None, achatador=achatar, compressao="zstd", tamanho_lote=50_000, intervalo_flush=30.0):
+        super().__init__(tamanho_lote, intervalo_flush)
+        self.caminho = caminho
+        self.esquema = esquema
+        self.achatador = achatador
+        self.compressao = compressao
+        self._escritor = None
+
+    def _converter(self, registro):
+        return self.achatador(registro) if self.achatador else registro
+
+    def _converter_tabela(self, construir):
+        # O esquema do arquivo é fixo depois do 1º lote: um lote com tipos mais
+        # largos (ex.: uint32 num esquema uint16) não cabe e vira erro claro.
+        import pyarrow as pa
+
+        try:
+            tabela = construir(self.esquema)
+            if self.esquema is not None and tabela.schema != self.esquema:
+                tabela = tabela.cast(self.esquema)
+            return tabela
+        except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError) as e:
+            raise ValueError(
+                f"Lote incompatível com o esquema de {self.caminho}: {e}. "
+                "Passe um esquema fixo (esquema=...) com tipos que comportem todos os lotes."
+            ) from e
+
+    def _escrever_tabela(self, tabela):
+        import pyarrow.parquet as pq
+
+        if self._escritor is None:
+            self.esquema = self.esquema or tabela.schema
+            self._escritor = pq.ParquetWriter(self.caminho, self.esquema, compression=self.compressao)
+        self._escritor.write_table(tabela)
+
+    def _gravar_lote(self, lote):
+        import pyarrow as pa
+
+        self._escrever_tabela(self._converter_tabela(lambda esquema: pa.Table.from_pylist(lote, schema=esquema)))
+
+    def escrever_dataframe(self, df):
+        """
+        Grava um DataFrame inteiro como row group (os registros pendentes vão antes).
+        """
+        import pyarrow as pa
+
+        with self._lock:
+            self._flush()
+            self._escrever_tabela(
+                self._converter_tabela(lambda esquema: pa.Table.from_pandas(df, schema=esquema, preserve_index=False))
+            )
+            self.registros_gravados += len(df)
+
+    def _fechar_arquivo(self):
+        if self._escritor is not None:
+            self._escritor.close()
@@ -0,0 +1,320 @@
+"""
+Executor único dos exercícios do repositório.
+
+Uso:
+    python executar.py listar
+    python executar.py rodar aula6.nivel2_exercicio9 --tamanho 1000000 --workers 8
+    python executar.py rodar aula4.exercicio10 --param cidade=Lisboa
+    python executar.py rodar aula2.enriquecimento --http-replay gravacoes.jsonl --http-modo reproduzir
+
+Os módulos das aulas só são importados quando um exercício deles é executado,
+então listar (ou rodar um exercício leve) não carrega pandas, matplotlib etc.
+"""
+
+import argparse
+import importlib
+import time
+
+from contextlib import nullcontext
+
+AULA4 = "aula_4.exercicios"
+AULA6 = "aula_6.atividade_paralelismo"
+
+# nome → módulo, função, dependências (atributos do módulo passados como
+# argumentos posicionais) e quais parâmetros recebem --tamanho / --workers.
+EXERCICIOS = {
+    "aula1.saudacao": {
+        "modulo": "aula_1.test",
+        "funcao": "main",
+        "descricao": "Lê nome e idade e imprime uma saudação",
+    },
+    "aula2.api_github": {
+        "modulo": "aula_2.api_test",
+        "funcao": "main",
+        "descricao": "Requisição de exemplo à API do GitHub",
+    },
+    "aula2.enriquecimento": {
+        "modulo": "aula_2.main",
+        "funcao": "enriquecimento_dados_cidade",
+        "params": {"cidade": "São Paulo"},
+        "descricao": "Enriquece uma cidade com clima, país e qualidade do ar",
+    },
+    "aula2.enriquecer_cidades": {
+        "modulo": "aula_2.main",
+        "funcao": "enriquecer_cidades",
+        "params": {"cidades": "São Paulo,Rio de Janeiro,Belo Horizonte,Lisboa,Madrid"},
+        "workers": "max_workers",
+        "descricao": "Enriquece várias cidades e grava em JSONL.gz/Parquet (--param caminho_saida=...)",
+    },
+    "aula4.exercicio1": {
+        "modulo": AULA4,
+        "funcao": "exercicio1_temperatura_media",
+        "dependencias": ["run_query", "get_temperatura"],
+        "descricao": "Temperatura média ponderada por clientes",
+    },
+    "aula4.exercicio2": {
+        "modulo": AULA4,
+        "funcao": "exercicio2_receita_amena",
+        "dependencias": ["run_query", "get_temperatura"],
+        "descricao": "Receita em cidades entre 18°C e 24°C",
+    },
+    "aula4.exercicio3": {
+        "modulo": AULA4,
+        "funcao": "exercicio3_alugueis_por_populacao",
+        "dependencias": ["run_query", "get_populacao"],
+        "descricao": "Aluguéis por 1000 habitantes por país",
+    },
+    "aula4.exercicio4": {
+        "modulo": AULA4,
+        "funcao": "exercicio4_filmes_poluidos",
+        "dependencias": ["run_query", "get_aqi"],
+        "descricao": "Filmes mais alugados em cidades poluídas",
+    },
+    "aula4.exercicio5": {
+        "modulo": AULA4,
+        "funcao": "exercicio5_clientes_areas_criticas",
+        "dependencias": ["run_query", "get_aqi", "get_temperatura"],
+        "descricao": "Clientes em áreas com AQI crítico",
+    },
+    "aula4.exercicio6": {
+        "modulo": AULA4,
+        "funcao": "exercicio6_receita_por_continente",
+        "dependencias": ["run_query", "get_continente"],
+        "descricao": "Gráfico de receita por continente",
+    },
+    "aula4.exercicio7": {
+        "modulo": AULA4,
+        "funcao": "exercicio7_tempo_medio",
+        "dependencias": ["run_query", "get_temperatura"],
+        "descricao": "Gráfico tempo médio de aluguel vs temperatura",
+    },
+    "aula4.exercicio8": {
+        "modulo": AULA4,
+        "funcao": "exercicio8_perfil_clima",
+        "dependencias": ["run_query", "get_aqi", "get_temperatura"],
+        "descricao": "Perfil de consumo por clima",
+    },
+    "aula4.exercicio9": {
+        "modulo": AULA4,
+        "funcao": "exercicio9_exportar_excel",
+        "dependencias": ["run_query", "get_aqi", "get_temperatura"],
+        "descricao": "Exporta relatório de clientes para Excel",
+    },
+    "aula4.relatorios": {
+        "modulo": AULA4,
+        "funcao": "executar_relatorios",
+        "workers": "max_workers",
+        "descricao": "Exercícios 1 a 9 com consultas e buscas compartilhadas",
+    },
+    "aula4.exercicio10": {
+        "modulo": AULA4,
+        "funcao": "exercicio10_cache_clima",
+        "dependencias": ["get_temperatura"],
+        "params": {"cidade": "São Paulo"},
+        "descricao": "Consulta de temperatura com cache",
+    },
+    "aula6.nivel1_exercicio1": {
+        "modulo": AULA6,
+        "funcao": "nivel1_exercicio1",
+        "descricao": "Crawler concorrente com threading.Thread",
+    },
+    "aula6.nivel1_exercicio1_escalavel": {
+        "modulo": AULA6,
+        "funcao": "nivel1_exercicio1_escalavel",
+        "tamanho": "num_urls",
+        "workers": "max_workers",
+        "descricao": "Crawler assíncrono contra servidor local (URLs/s)",
+    },
+    "aula6.nivel1_exercicio2": {
+        "modulo": AULA6,
+        "funcao": "nivel1_exercicio2",
+        "tamanho": "num_arquivos",
+        "workers": "max_workers",
+        "descricao": "Leitura paralela de CSVs com ThreadPoolExecutor",
+    },
+    "aula6.nivel1_exercicio3": {
+        "modulo": AULA6,
+        "funcao": "nivel1_exercicio3",
+        "descricao": "Monitoramento de tempo de resposta de URLs",
+    },
+    "aula6.nivel1_exercicio4": {
+        "modulo": AULA6,
+        "funcao": "nivel1_exercicio4",
+        "tamanho": "num_arquivos",
+        "workers": "max_workers",
+        "descricao": "Download concorrente simulado",
+    },
+    "aula6.nivel1_exercicio5": {
+        "modulo": AULA6,
+        "funcao": "nivel1_exercicio5",
+        "descricao": "Consulta simulada a múltiplas bases",
+    },
+    "aula6.nivel2_exercicio6": {
+        "modulo": AULA6,
+        "funcao": "nivel2_exercicio6",
+        "tamanho": "tamanho_total",
+        "workers": "num_processos",
+        "descricao": "Transformação pesada com ProcessPoolExecutor",
+    },
+    "aula6.nivel2_exercicio7": {
+        "modulo": AULA6,
+        "funcao": "nivel2_exercicio7",
+        "tamanho": "num_linhas",
+        "workers": "num_processos",
+        "descricao": "Função complexa aplicada em paralelo a um DataFrame",
+    },
+    "aula6.benchmark_funcao_complexa": {
+        "modulo": "aula_6.benchmark_funcao_complexa",
+        "funcao": "benchmark_funcao_complexa",
+        "tamanho": "num_linhas",
+        "descricao": "Tempo, banda e pico de memória da funcao_complexa (original vs kernel)",
+    },
+    "aula6.nivel2_exercicio8": {
+        "modulo": AULA6,
+        "funcao": "nivel2_exercicio8",
+        "tamanho": "num_arquivos",
+        "workers": "max_workers",
+        "descricao": "Conversão paralela Parquet → CSV",
+    },
+    "aula6.nivel2_exercicio9": {
+        "modulo": AULA6,
+        "funcao": "nivel2_exercicio9",
+        "tamanho": "num_linhas",
+        "workers": "num_processos",
+        "descricao": "Agregações por grupo com multiprocessing",
+    },
+    "aula6.nivel2_exercicio9_fora_memoria": {
+        "modulo": AULA6,
+        "funcao": "nivel2_exercicio9",
+        "params": {"fora_memoria": True},
+        "tamanho": "num_linhas",
+        "workers": "num_processos",
+        "descricao": "Agregações por grupo fora da memória (spill em disco)",
+    },
+    "aula6.nivel2_exercicio10": {
+        "modulo": AULA6,
+        "funcao": "nivel2_exercicio10",
+        "tamanho": "num_blocos",
+        "descricao": "Pipeline transformação + persistência",
+    },
+}
+
+
+# Valores de --param que não são números nem texto (comparação sem caixa)
+CONSTANTES_PARAM = {"true": True, "false": False, "none": None}
+
+
+def _converter(valor):
+    if valor.lower() in CONSTANTES_PARAM:
+        return CONSTANTES_PARAM[valor.lower()]
+    for tipo in (int, float):
+        try:
+            return tipo(valor)
+        except ValueError:
+            pass
+    return valor
+
+
+def listar():
+    largura = max(len(nome) for nome in EXERCICIOS)
+    for nome, info in EXERCICIOS.items():
+        opcoes = [op for op in ("tamanho", "workers") if op in info]
+        extra = f" [--{' --'.join(opcoes)}]" if opcoes else ""
+        print(f"{nome.ljust(largura)}  {info['descricao']}{extra}")
+
+
+def rodar(nome, tamanho=None, workers=None, params=None, estrito=True):
+    """
+    Importa o módulo do exercício e o executa.
+    Args:
+        nome (str): Nome do exercício (ver `listar`).
+        tamanho (int): Valor do parâmetro de tamanho, se o exercício aceitar.
+        workers (int): Número de workers, se o exercício aceitar.
+        params (dict): Parâmetros extras passados como keyword arguments.
+        estrito (bool): Se False, ignora --tamanho/--workers não suportados.
+    Returns:
+        O retorno da função do exercício.
+    """
+    if nome not in EXERCICIOS:
+        raise SystemExit(f"Exercício desconhecido: {nome} (use 'listar')")
+    info = EXERCICIOS[nome]
+
+    kwargs = dict(info.get("params", {}))
+    for opcao, valor in (("tamanho", tamanho), ("workers", workers)):
+        if valor is None:
+            continue
+        if opcao not in info:
+            if not estrito:
+                continue
+            raise SystemExit(f"O exercício {nome} não aceita --{opcao}")
+        kwargs[info[opcao]] = valor
+    kwargs.update(params or {})
+
+    modulo = importlib.import_module(info["modulo"])
+    funcao = getattr(modulo, info["funcao"])
+    dependencias = [getattr(modulo, dep) for dep in info.get("dependencias", [])]
+    return funcao(*dependencias, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa os exercícios das aulas.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("listar", help="lista os exercícios disponíveis")
+
+    p_rodar = sub.add_parser("rodar", help="executa um ou mais exercícios")
+    p_rodar.add_argument("nomes", nargs="+", help="nomes dos exercícios")
+    p_rodar.add_argument("--tamanho", type=int, help="tamanho da entrada")
+    p_rodar.add_argument("--workers", type=int, help="número de workers")
+    p_rodar.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="CHAVE=VALOR",
+        help="parâmetro extra para o exercício (pode repetir); números, true/false e none são convertidos",
+    )
+    p_rodar.add_argument(
+        "--http-replay",
+        metavar="ARQUIVO",
+        help="grava/reproduz as respostas HTTP neste arquivo JSONL",
+    )
+    p_rodar.add_argument(
+        "--http-modo",
+        choices=["gravar", "reproduzir", "auto"],
+        default="auto",
+        help="modo do --http-replay (padrão: auto)",
+    )
+    p_rodar.add_argument(
+        "--http-latencia",
+        help="latência injetada na reprodução: perfil (local, lan, internet, api_lenta), 'gravada' ou segundos",
+    )
+    args = parser.parse_args(argv)
+
+    if args.comando == "listar":
+        listar()
+        return
+
+    params = {}
+    for item in args.param:
+        chave, _, valor = item.partition("=")
+        params[chave] = _converter(valor)
+
+    replay = nullcontext()
+    if args.http_replay:
+        from comum.http_replay import ativar_replay
+
+        latencia = args.http_latencia
+        if latencia is not None:
+            latencia = _converter(latencia)
+        replay = ativar_replay(args.http_replay, args.http_modo, latencia)
+
+    # Com vários exercícios, --tamanho/--workers valem só para os que aceitam
+    estrito = len(args.nomes) == 1
+    with replay:
+        for nome in args.nomes:
+            inicio = time.perf_counter()
+            rodar(nome, args.tamanho, args.workers, params, estrito)
+            print(f"[{nome}] concluído em {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()